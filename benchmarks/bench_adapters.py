@@ -0,0 +1,107 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Benchmarks for adapting sky coordinates over whole columns, and for reading the metadata of many positions with eager,
+lazy and no adapters.
+"""
+import numpy
+from astropy import units as u
+
+from rama import read
+from rama.adapters.astropy import SkyCoordAdapter
+from rama.models.coordinates import EquatorialCoord, GalacticCoord, SpaceFrame
+from rama.models.measurements import SkyPosition
+
+N_ROWS = 10 ** 6
+
+N_POSITIONS = 1000
+
+POSITION = '''
+<INSTANCE dmtype="meas:SkyPosition">
+  <ATTRIBUTE dmrole="meas:CoordMeasure.coord">
+    <INSTANCE dmtype="coords:domain.space.EquatorialCoord">
+      <ATTRIBUTE dmrole="coords:domain.space.EquatorialCoord.ra">
+        <LITERAL value="{ra}" dmtype="ivoa:RealQuantity" unit="deg"/>
+      </ATTRIBUTE>
+      <ATTRIBUTE dmrole="coords:domain.space.EquatorialCoord.dec">
+        <LITERAL value="{dec}" dmtype="ivoa:RealQuantity" unit="deg"/>
+      </ATTRIBUTE>
+      <REFERENCE dmrole="coords:Coordinate.frame"><IDREF>_SPACE_FRAME</IDREF></REFERENCE>
+    </INSTANCE>
+  </ATTRIBUTE>
+</INSTANCE>'''
+
+POSITIONS_DOCUMENT = '''<?xml version="1.0" encoding="utf-8"?>
+<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.4">
+<VODML>
+<GLOBALS>
+<INSTANCE dmtype="coords:domain.space.SpaceFrame" ID="_SPACE_FRAME">
+  <ATTRIBUTE dmrole="coords:domain.space.SpaceFrame.spaceRefFrame">
+    <LITERAL value="FK5" dmtype="coords:domain.space.StdRefFrame"/>
+  </ATTRIBUTE>
+</INSTANCE>{positions}
+</GLOBALS>
+</VODML>
+</VOTABLE>'''
+
+
+class SkyCoords:
+    params = [1, 1000]
+    param_names = ['coordinates']
+
+    def setup(self, n_coords):
+        frame = SpaceFrame()
+        frame.space_ref_frame = 'FK5'
+        frame.equinox = 'J2000'
+        longitudes = numpy.linspace(0, 360, N_ROWS // n_coords, endpoint=False) * u.deg
+        latitudes = numpy.linspace(-90, 90, N_ROWS // n_coords) * u.deg
+        self.equatorial = [EquatorialCoord() for _ in range(n_coords)]
+        self.galactic = [GalacticCoord() for _ in range(n_coords)]
+        for equatorial, galactic in zip(self.equatorial, self.galactic):
+            equatorial.frame, equatorial.ra, equatorial.dec = frame, longitudes, latitudes
+            galactic.l, galactic.b = longitudes, latitudes
+
+    def time_equatorial(self, n_coords):
+        for coord in self.equatorial:
+            SkyCoordAdapter(coord)
+
+    def time_galactic(self, n_coords):
+        for coord in self.galactic:
+            SkyCoordAdapter(coord)
+
+
+class MetadataScan:
+    """
+    Read the reference frame of every position, which does not need the astropy coordinates.
+    """
+    params = ['eager', 'lazy', 'raw']
+    param_names = ['adapters']
+
+    def setup(self, adapters):
+        positions = ''.join(POSITION.format(ra=index % 360, dec=index % 180 - 90) for index in range(N_POSITIONS))
+        self.document = POSITIONS_DOCUMENT.format(positions=positions).encode('utf-8')
+        self.options = {'lazy_adapters': adapters == 'lazy', 'raw': adapters == 'raw'}
+
+    def time_read_frames(self, adapters):
+        positions = read(self.document, **self.options).find_instances(SkyPosition)
+        for position in positions:
+            getattr(position.coord, '__vo_object__', position.coord).frame
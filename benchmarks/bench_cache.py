@@ -0,0 +1,106 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Benchmarks for cold and warm reads through the on-disk parse cache.
+"""
+import os
+import shutil
+import tempfile
+
+from rama import read
+from rama.models.measurements import SkyPosition
+
+POSITION_DOCUMENT = '''<?xml version="1.0" encoding="utf-8"?>
+<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.4">
+  <VODML>
+    <GLOBALS>
+      <INSTANCE dmtype="coords:domain.space.SpaceFrame" ID="_SPACE_FRAME">
+        <ATTRIBUTE dmrole="coords:domain.space.SpaceFrame.spaceRefFrame">
+          <LITERAL value="FK5" dmtype="coords:domain.space.StdRefFrame"/>
+        </ATTRIBUTE>
+        <ATTRIBUTE dmrole="coords:domain.space.SpaceFrame.equinox">
+          <LITERAL value="J1975" dmtype="coords:domain.space.Epoch"/>
+        </ATTRIBUTE>
+      </INSTANCE>
+      <INSTANCE dmtype="meas:SkyPosition">
+        <ATTRIBUTE dmrole="meas:CoordMeasure.coord">
+          <INSTANCE dmtype="coords:domain.space.EquatorialCoord">
+            <ATTRIBUTE dmrole="coords:domain.space.EquatorialCoord.ra">
+              <COLUMN ref="_RA" dmtype="ivoa:RealQuantity"/>
+            </ATTRIBUTE>
+            <ATTRIBUTE dmrole="coords:domain.space.EquatorialCoord.dec">
+              <COLUMN ref="_DEC" dmtype="ivoa:RealQuantity"/>
+            </ATTRIBUTE>
+            <REFERENCE dmrole="coords:Coordinate.frame">
+              <IDREF>_SPACE_FRAME</IDREF>
+            </REFERENCE>
+          </INSTANCE>
+        </ATTRIBUTE>
+      </INSTANCE>
+    </GLOBALS>
+  </VODML>
+  <RESOURCE>
+    <TABLE ID="_table1">
+      <FIELD name="ra" ID="_RA" unit="deg" datatype="double"/>
+      <FIELD name="dec" ID="_DEC" unit="deg" datatype="double"/>
+      <DATA>
+        <TABLEDATA>
+{rows}
+        </TABLEDATA>
+      </DATA>
+    </TABLE>
+  </RESOURCE>
+</VOTABLE>'''
+
+
+def position_document(n_rows):
+    rows = '\n'.join(f'<TR><TD>{i % 360}.5</TD><TD>{i % 179 - 89}.25</TD></TR>' for i in range(n_rows))
+    return POSITION_DOCUMENT.format(rows=rows)
+
+
+class CachedReads:
+    """
+    Read a document with a single table, with an empty cache and with the document already in the cache.
+    """
+    params = [1000, 100000]
+    param_names = ['rows']
+
+    def setup(self, n_rows):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'positions.vot.xml')
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        with open(self.path, 'w') as file:
+            file.write(position_document(n_rows))
+        read(self.path, cache_dir=self.cache_dir)
+
+    def teardown(self, n_rows):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_uncached(self, n_rows):
+        read(self.path).find_instances(SkyPosition)
+
+    def time_cold(self, n_rows):
+        read(self.path, cache_dir=os.path.join(self.directory, 'cold')).find_instances(SkyPosition)
+        shutil.rmtree(os.path.join(self.directory, 'cold'))
+
+    def time_warm(self, n_rows):
+        read(self.path, cache_dir=self.cache_dir).find_instances(SkyPosition)
@@ -0,0 +1,66 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Benchmarks for parsing ISO 8601 timestamps, one at a time as for ``ivoa:datetime`` literals, and as whole columns.
+"""
+import numpy
+from dateutil import parser
+
+from rama.utils.isotime import parse_datetime, to_datetime64, to_time
+
+N_LITERALS = 10000
+N_TIMESTAMPS = 10 ** 6
+
+
+def _timestamps(n):
+    start = numpy.datetime64('2000-01-01T00:00:00.000')
+    return (start + numpy.arange(n) * numpy.timedelta64(123457, 'ms')).astype(str)
+
+
+class Literals:
+    def setup(self):
+        self.timestamps = _timestamps(N_LITERALS).tolist()
+
+    def time_parse_datetime(self):
+        for timestamp in self.timestamps:
+            parse_datetime(timestamp)
+
+    def time_dateutil(self):
+        for timestamp in self.timestamps:
+            parser.parse(timestamp)
+
+
+class Columns:
+    timeout = 120
+
+    def setup(self):
+        self.timestamps = _timestamps(N_TIMESTAMPS)
+        self.offset_timestamps = numpy.char.add(self.timestamps, '+00:00')
+
+    def time_to_datetime64(self):
+        to_datetime64(self.timestamps)
+
+    def time_to_time(self):
+        to_time(self.timestamps)
+
+    def time_to_datetime64_offsets(self):
+        to_datetime64(self.offset_timestamps)
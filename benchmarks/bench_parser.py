@@ -0,0 +1,52 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Benchmarks for materializing model instances from VO-DML annotations.
+"""
+import time
+
+from rama import read
+from rama.models.measurements import GenericCoordMeasure
+
+from .generator import generate
+
+
+class MakeInstances:
+    """
+    Build many small, literal-valued instances, so that the per-instance overhead of Parser.make dominates.
+    """
+    params = [100, 1000, 10000]
+    param_names = ['instances']
+
+    def setup(self, n_instances):
+        self.document = generate(n_instances=n_instances, reference_density=0.0, n_tables=0)
+
+    def time_find_instances(self, n_instances):
+        read(self.document).find_instances(GenericCoordMeasure)
+
+    def track_instances_per_second(self, n_instances):
+        reader = read(self.document)
+        start = time.perf_counter()
+        reader.find_instances(GenericCoordMeasure)
+        return n_instances / (time.perf_counter() - start)
+
+    track_instances_per_second.unit = "instances/s"
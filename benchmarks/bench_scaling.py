@@ -0,0 +1,139 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Scaling benchmarks for reading synthetic documents, see :py:mod:`benchmarks.generator`.
+
+Each benchmark times ``rama.read`` followed by ``find_instances``, measures its peak memory, and counts the lookups
+into the annotation index, which replaced the XPath queries the parser used to run for every role and reference.
+"""
+from abc import ABCMeta, abstractmethod
+from unittest import mock
+
+from rama import read
+from rama.models.measurements import GenericCoordMeasure
+from rama.reader.votable.index import AnnotationIndex
+
+from .generator import generate
+
+INDEX_LOOKUPS = ('find_element_for_role', 'find_instance_by_id', 'find_field', 'find_instances_by_type')
+
+
+def read_and_find(document):
+    return read(document).find_instances(GenericCoordMeasure)
+
+
+def count_lookups(document):
+    patches = [mock.patch.object(AnnotationIndex, name, autospec=True, side_effect=getattr(AnnotationIndex, name))
+               for name in INDEX_LOOKUPS]
+    mocks = [patch.start() for patch in patches]
+    try:
+        read_and_find(document)
+    finally:
+        for patch in patches:
+            patch.stop()
+    return sum(lookup.call_count for lookup in mocks)
+
+
+class _ScalingSuite(metaclass=ABCMeta):
+    """
+    Subclasses set ``params`` and ``param_names``, and ``document_parameters`` maps a parameter value to the
+    keyword arguments of :py:func:`~benchmarks.generator.generate`.
+    """
+    timeout = 300
+
+    @abstractmethod
+    def document_parameters(self, value):
+        pass
+
+    def setup(self, value):
+        self.document = generate(**self.document_parameters(value))
+
+    def time_read_and_find(self, value):
+        read_and_find(self.document)
+
+    def peakmem_read_and_find(self, value):
+        read_and_find(self.document)
+
+    def track_index_lookups(self, value):
+        return count_lookups(self.document)
+
+    track_index_lookups.unit = "lookups"
+
+
+class Instances(_ScalingSuite):
+    params = [100, 1000, 10000]
+    param_names = ['instances']
+
+    def document_parameters(self, value):
+        return {'n_instances': value}
+
+
+class ReferenceDensity(_ScalingSuite):
+    params = [0.0, 0.5, 1.0]
+    param_names = ['reference_density']
+
+    def document_parameters(self, value):
+        return {'n_instances': 1000, 'reference_density': value}
+
+
+class NestingDepth(_ScalingSuite):
+    params = [0, 4, 16]
+    param_names = ['depth']
+
+    def document_parameters(self, value):
+        return {'n_instances': 1000, 'depth': value}
+
+
+class TemplateRows(_ScalingSuite):
+    params = [1000, 10000, 100000]
+    param_names = ['rows']
+
+    def document_parameters(self, value):
+        return {'n_instances': 10, 'n_rows': value}
+
+
+class Tables(_ScalingSuite):
+    params = [1, 10, 100]
+    param_names = ['tables']
+
+    def document_parameters(self, value):
+        return {'n_instances': 10, 'n_tables': value, 'n_rows': 1000}
+
+
+class StreamedScan:
+    """
+    Compare materializing all the global measures of a streamed document with scanning them one at a time.
+    """
+    params = [1000, 10000]
+    param_names = ['instances']
+    timeout = 300
+
+    def setup(self, value):
+        self.document = generate(n_instances=value, reference_density=0.0)
+
+    def peakmem_find_instances(self, value):
+        for _ in read(self.document, streaming=True).find_instances(GenericCoordMeasure):
+            pass
+
+    def peakmem_find_instances_iter(self, value):
+        for _ in read(self.document, streaming=True).find_instances_iter(GenericCoordMeasure):
+            pass
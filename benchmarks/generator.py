@@ -0,0 +1,126 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Synthetic VO-DML annotated VOTables for scaling benchmarks.
+
+:py:func:`~generate` builds a document with ``n_instances`` ``meas:GenericCoordMeasure`` instances in GLOBALS, and
+``n_tables`` tables of ``n_rows`` rows, each with a templated ``meas:GenericCoordMeasure`` mapped on its columns. The
+coordinate of each global measure is nested ``depth`` levels deep in ``coords:CompositeCoordinate`` instances, and a
+fraction ``reference_density`` of the global measures refers to one of the shared space frames.
+"""
+MEASURE = '''
+<INSTANCE dmtype="meas:GenericCoordMeasure">
+  <ATTRIBUTE dmrole="meas:CoordMeasure.coord">{coord}</ATTRIBUTE>
+  <COMPOSITION dmrole="meas:CoordMeasure.error">
+    <INSTANCE dmtype="meas:Error1D">
+      <ATTRIBUTE dmrole="meas:Error1D.statError">
+        <INSTANCE dmtype="meas:Symmetrical1D">
+          <ATTRIBUTE dmrole="meas:Symmetrical1D.radius">{error}</ATTRIBUTE>
+        </INSTANCE>
+      </ATTRIBUTE>
+    </INSTANCE>
+  </COMPOSITION>
+</INSTANCE>'''
+
+COORD_VALUE = '''
+<INSTANCE dmtype="coords:GenericCoordValue">
+  <ATTRIBUTE dmrole="coords:PhysicalCoordValue.cval">{value}</ATTRIBUTE>{frame}
+</INSTANCE>'''
+
+COMPOSITE_COORD = '''
+<INSTANCE dmtype="coords:CompositeCoordinate">
+  <ATTRIBUTE dmrole="coords:CompositeCoordinate.cmpt">{coord}</ATTRIBUTE>
+</INSTANCE>'''
+
+FRAME_REFERENCE = '''
+  <REFERENCE dmrole="coords:Coordinate.frame"><IDREF>_FRAME_{index}</IDREF></REFERENCE>'''
+
+FRAME = '''
+<INSTANCE dmtype="coords:domain.space.SpaceFrame" ID="_FRAME_{index}">
+  <ATTRIBUTE dmrole="coords:domain.space.SpaceFrame.spaceRefFrame">
+    <LITERAL value="ICRS" dmtype="coords:domain.space.StdRefFrame"/>
+  </ATTRIBUTE>
+</INSTANCE>'''
+
+LITERAL = '<LITERAL value="{value}" dmtype="ivoa:RealQuantity" unit="mag"/>'
+
+COLUMN = '<COLUMN ref="{ref}" dmtype="ivoa:RealQuantity"/>'
+
+TEMPLATES = '''
+<TEMPLATES tableref="_TABLE_{table}">{measure}
+</TEMPLATES>'''
+
+TABLE = '''
+<TABLE ID="_TABLE_{table}">
+  <FIELD name="value" ID="_TABLE_{table}_VALUE" unit="mag" datatype="double"/>
+  <FIELD name="error" ID="_TABLE_{table}_ERROR" unit="mag" datatype="double"/>
+  <DATA>
+    <TABLEDATA>
+{rows}
+    </TABLEDATA>
+  </DATA>
+</TABLE>'''
+
+DOCUMENT = '''<?xml version="1.0" encoding="utf-8"?>
+<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.4">
+<VODML>
+<GLOBALS>{frames}{measures}
+</GLOBALS>{templates}
+</VODML>
+<RESOURCE>{tables}
+</RESOURCE>
+</VOTABLE>'''
+
+INSTANCES_PER_FRAME = 10
+
+
+def generate(n_instances=100, reference_density=1.0, depth=0, n_tables=1, n_rows=100):
+    """
+    Return an annotated VOTable document as bytes. See the module documentation for the meaning of the parameters.
+    """
+    n_referring = round(n_instances * reference_density)
+    n_frames = -(-n_referring // INSTANCES_PER_FRAME)
+
+    frames = ''.join(FRAME.format(index=index) for index in range(n_frames))
+    measures = ''.join(_global_measure(index, depth, index < n_referring) for index in range(n_instances))
+    templates = ''.join(TEMPLATES.format(table=table, measure=_template_measure(table)) for table in range(n_tables))
+    tables = ''.join(TABLE.format(table=table, rows=_rows(n_rows)) for table in range(n_tables))
+
+    document = DOCUMENT.format(frames=frames, measures=measures, templates=templates, tables=tables)
+    return document.encode('utf-8')
+
+
+def _global_measure(index, depth, refers_to_frame):
+    frame = FRAME_REFERENCE.format(index=index // INSTANCES_PER_FRAME) if refers_to_frame else ''
+    coord = COORD_VALUE.format(value=LITERAL.format(value=index % 30 + 0.5), frame=frame)
+    for _ in range(depth):
+        coord = COMPOSITE_COORD.format(coord=coord)
+    return MEASURE.format(coord=coord, error=LITERAL.format(value=0.01))
+
+
+def _template_measure(table):
+    coord = COORD_VALUE.format(value=COLUMN.format(ref=f"_TABLE_{table}_VALUE"), frame='')
+    return MEASURE.format(coord=coord, error=COLUMN.format(ref=f"_TABLE_{table}_ERROR"))
+
+
+def _rows(n_rows):
+    return '\n'.join(f'<TR><TD>{row % 30 + 0.5}</TD><TD>0.01</TD></TR>' for row in range(n_rows))
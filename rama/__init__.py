@@ -19,25 +19,15 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-import logging
-
-from pkg_resources import iter_entry_points
-
 from rama.framework import VodmlDescriptor, Composition
 from rama.reader import Reader
+from rama.reader.stats import ReaderStats
+from rama.reader.rows import is_template
 from rama.reader.votable import Votable
-
-LOG = logging.getLogger(__name__)
-
-for entry_point in iter_entry_points(group='vo.dm.models', name=None):
-    try:
-        __import__(entry_point.module_name, globals(), locals())
-        LOG.info(f"Successfully imported vodml model package {entry_point.name}")
-    except ImportError:
-        LOG.warning(f"Cannot import vodml model package {entry_point.name}")
+from rama.batch import ReadResult, read_many
 
 
-def read(filename, fmt='votable'):
+def read(filename, fmt='votable', stats=None, intern_literals=False, lazy_adapters=False, raw=False, **kwargs):
     formats = {
         'votable': Votable,
     }
@@ -45,14 +35,8 @@ def read(filename, fmt='votable'):
     if fmt not in formats:
         raise AttributeError(f"No such format: {fmt}. Available formats: {fmt.keys()}")
 
-    return Reader(formats[fmt](filename))
-
-
-def is_template(instance):
-    if hasattr(instance, "__vo_object__"):
-        return is_template(instance.__vo_object__)
-
-    if hasattr(instance, "is_template"):
-        return instance.is_template
+    if stats is True:
+        stats = ReaderStats()
 
-    return False
+    document = formats[fmt](filename, stats=stats, **kwargs)
+    return Reader(document, stats=stats, intern_literals=intern_literals, lazy_adapters=lazy_adapters, raw=raw)
@@ -62,4 +62,133 @@ There are no restrictions on how the adapter needs to be implemented. In the abo
 regular Python initializer method to initialize itself with data from the standard object. In other cases
 adapters might implement the ``__new__`` method and return a completely different object.
 
+Building astropy objects is not free, so adapters can also be applied lazily, with ``read(..., lazy_adapters=True)``:
+the parser then returns a :py:class:`~LazyAdapter` proxy, which only applies the adapter the first time an attribute
+of the adapted object is accessed. The standard object is available as the ``__vo_object__`` attribute of the proxy,
+which does not apply the adapter. With ``read(..., raw=True)`` adapters are not applied at all, and the standard
+objects are returned as they are.
+
 """
+import operator
+
+import numpy
+
+
+class LazyAdapter:
+    """
+    A proxy for the object that ``adapter`` builds from ``vo_object``. The adapter is only applied when the proxy is
+    first used, i.e. when one of its attributes is accessed, when it is compared, used in arithmetic, iterated over,
+    indexed or assigned to by index, converted to a string or to an array, formatted, or when its class is checked with
+    ``isinstance``. Use :py:func:`~resolve` to get the adapted object itself.
+    """
+    __slots__ = ('_adapter', '_adapted', '__vo_object__', '__vo_id__', '__weakref__')
+
+    def __init__(self, adapter, vo_object):
+        object.__setattr__(self, '_adapter', adapter)
+        object.__setattr__(self, '_adapted', None)
+        object.__setattr__(self, '__vo_object__', vo_object)
+        object.__setattr__(self, '__vo_id__', None)
+
+    def _resolve(self):
+        adapted = self._adapted
+        if adapted is None:
+            adapted = self._adapter(self.__vo_object__)
+            if adapted is not self.__vo_object__:
+                adapted.__vo_object__ = self.__vo_object__
+            adapted.__vo_id__ = self.__vo_id__
+            object.__setattr__(self, '_adapted', adapted)
+        return adapted
+
+    @property
+    def __class__(self):
+        return self._resolve().__class__
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        if name in ('__vo_object__', '__vo_id__'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._resolve(), name, value)
+
+    def __repr__(self):
+        return repr(self._resolve())
+
+    def __str__(self):
+        return str(self._resolve())
+
+    def __format__(self, format_spec):
+        return format(self._resolve(), format_spec)
+
+    __hash__ = object.__hash__
+
+    def __bool__(self):
+        return bool(self._resolve())
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __getitem__(self, item):
+        return self._resolve()[item]
+
+    def __setitem__(self, item, value):
+        self._resolve()[item] = resolve(value)
+
+    def __delitem__(self, item):
+        del self._resolve()[item]
+
+    def __array__(self, *args, **kwargs):
+        return numpy.asarray(self._resolve(), *args, **kwargs)
+
+    def __reduce_ex__(self, protocol):
+        # Pickling, e.g. to send instances back from the workers of read_many, pickles the adapted object
+        return self._resolve().__reduce_ex__(protocol)
+
+
+def resolve(instance):
+    """
+    Return the adapted object if ``instance`` is a :py:class:`~LazyAdapter`, or ``instance`` itself otherwise.
+    """
+    if type(instance) is LazyAdapter:
+        return instance._resolve()
+    return instance
+
+
+def _forward_unary(operation):
+    def forward(self):
+        return operation(self._resolve())
+    return forward
+
+
+def _forward_binary(operation):
+    def forward(self, other):
+        return operation(self._resolve(), resolve(other))
+    return forward
+
+
+def _forward_reflected(operation):
+    def forward(self, other):
+        return operation(resolve(other), self._resolve())
+    return forward
+
+
+for _name, _operation in (('neg', operator.neg), ('pos', operator.pos), ('abs', operator.abs),
+                          ('invert', operator.invert)):
+    setattr(LazyAdapter, f'__{_name}__', _forward_unary(_operation))
+
+for _name, _operation in (('eq', operator.eq), ('ne', operator.ne), ('lt', operator.lt), ('le', operator.le),
+                          ('gt', operator.gt), ('ge', operator.ge)):
+    setattr(LazyAdapter, f'__{_name}__', _forward_binary(_operation))
+
+for _name, _operation in (('add', operator.add), ('sub', operator.sub), ('mul', operator.mul),
+                          ('truediv', operator.truediv), ('floordiv', operator.floordiv), ('mod', operator.mod),
+                          ('pow', operator.pow), ('matmul', operator.matmul), ('and', operator.and_),
+                          ('or', operator.or_), ('xor', operator.xor)):
+    setattr(LazyAdapter, f'__{_name}__', _forward_binary(_operation))
+    setattr(LazyAdapter, f'__r{_name}__', _forward_reflected(_operation))
+
+del _name, _operation
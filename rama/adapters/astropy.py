@@ -24,15 +24,18 @@
 This module provides astropy-specific adapters. See `~rama.adapters` for more information on adapters.
 """
 import logging
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 
-from astropy.coordinates import SkyCoord
+from astropy import units as u
+from astropy.coordinates import (CartesianRepresentation, SkyCoord, SphericalRepresentation,
+                                 UnitSphericalRepresentation, frame_transform_graph)
 from astropy.time import Time
 from astropy.units import Quantity, UnitTypeError
 
 import numpy
-from numpy import nan_to_num
 
-from rama.models import coordinates
+from rama.utils.isotime import to_time
 
 LOG = logging.getLogger(__name__)
 
@@ -41,58 +44,174 @@ class SkyCoordAdapter:
     A an adapter for sky coordinates. The initializer takes a standard
     :py:class:`~rama.models.coordinates.SkyCoord` instance and returns an astropy.coordinates.SkyCoord object based
     on the contents of the original instance.
+
+    All the subtypes of :py:class:`~rama.models.coordinates.SkyCoord` are supported: the components of the coordinate,
+    e.g. ``l`` and ``b`` for a :py:class:`~rama.models.coordinates.GalacticCoord`, are wrapped in an astropy
+    representation without copying them, so that whole columns are adapted in a single step. The astropy frame of each
+    :py:class:`~rama.models.coordinates.SpaceFrame` instance is only built once, and shared by all the coordinates
+    that refer to it.
     """
 
     def __new__(cls, stc_position_coord):
-        try:
-            frame = stc_position_coord.frame.space_ref_frame.lower()
-            equinox = stc_position_coord.frame.equinox
-        except (AttributeError, ValueError):
-            frame = "icrs"
-            equinox = None
+        layout = _sky_coord_layout(type(stc_position_coord))
+        if layout is None:
+            LOG.warning(f"Can't apply adapter: unsupported coordinate type {type(stc_position_coord).__name__}")
+            return stc_position_coord
+        kind, attributes, default_frame = layout
 
         try:
-            ra = stc_position_coord.ra
-            dec = stc_position_coord.dec
-            sky_coord = SkyCoord(frame=frame, equinox=equinox, ra=ra, dec=dec)
-            return sky_coord
-        except (AttributeError, UnitTypeError, ValueError) as exc:
+            components = [getattr(stc_position_coord, attribute) for attribute in attributes]
+            if components[0] is None or components[1] is None:
+                raise ValueError("Cannot create a SkyCoord without data")
+            frame = _astropy_frame(stc_position_coord.frame, default_frame)
+            representation = _make_representation(kind, *components)
+            return SkyCoord(frame.realize_frame(representation), copy=False)
+        except (AttributeError, UnitTypeError, ValueError, TypeError) as exc:
             LOG.warning(f"Can't apply adapter: {exc}")
             return stc_position_coord
 
 
-# FIXME this is full of hacks and shortcuts
+# Names of the STC standard reference frames that differ from the names of the astropy frames
+_FRAME_NAMES = {
+    'ecliptic': 'geocentricmeanecliptic',
+    'super_galactic': 'supergalactic',
+}
+
+# The astropy frame of each SpaceFrame instance
+_SPACE_FRAMES = WeakKeyDictionary()
+
+
+@lru_cache(maxsize=None)
+def _sky_coord_layout(coord_class):
+    # Return the kind of representation, the attributes holding its components and the default frame of coord_class
+    # The coordinates model uses this adapter, so it can only be imported once the adapter module is loaded
+    from rama.models import coordinates
+
+    layouts = (
+        (coordinates.EquatorialCoord, 'spherical', ('ra', 'dec', 'r'), 'icrs'),
+        (coordinates.GalacticCoord, 'spherical', ('l', 'b', 'r'), 'galactic'),
+        (coordinates.EclipticCoord, 'spherical', ('elong', 'elat', 'r'), 'geocentricmeanecliptic'),
+        (coordinates.LongLatCoord, 'spherical', ('long', 'lat', 'r'), 'icrs'),
+        (coordinates.CartesianCoord, 'cartesian', ('x', 'y', 'z'), 'icrs'),
+        (coordinates.UnitSphereCoord, 'direction', ('dircosx', 'dircosy', 'dircosz'), 'icrs'),
+    )
+    for layout_class, kind, attributes, default_frame in layouts:
+        if issubclass(coord_class, layout_class):
+            return kind, attributes, default_frame
+    return None
+
+
+def _astropy_frame(space_frame, default_frame):
+    if space_frame is None:
+        return _make_frame(default_frame, None)
+
+    frame = _SPACE_FRAMES.get(space_frame)
+    if frame is None:
+        try:
+            name = space_frame.space_ref_frame.lower()
+            equinox = space_frame.equinox
+        except (AttributeError, ValueError):
+            name = default_frame
+            equinox = None
+        frame = _SPACE_FRAMES[space_frame] = _make_frame(_FRAME_NAMES.get(name, name), equinox)
+    return frame
+
+
+@lru_cache(maxsize=64)
+def _make_frame(name, equinox):
+    frame_class = frame_transform_graph.lookup_name(name)
+    if frame_class is None:
+        raise ValueError(f"Unknown reference frame: {name}")
+    if equinox is not None and 'equinox' in frame_class.frame_attributes:
+        return frame_class(equinox=equinox)
+    return frame_class()
+
+
+def _make_representation(kind, first, second, third):
+    if kind == 'spherical':
+        if third is None:
+            return UnitSphericalRepresentation(first, second, copy=False)
+        return SphericalRepresentation(first, second, third, copy=False)
+
+    cartesian = CartesianRepresentation(first, second, third, copy=False)
+    if kind == 'direction':
+        return cartesian.represent_as(UnitSphericalRepresentation)
+    return cartesian
+
+
 class TimeAdapter:
     """
     Adapter for time objects and arrays. It takes a standard :py:class:`~rama.models.coordinates.TimeStamp` instance
     and returns an astropy Time quantity.
+
+    Time columns are converted in a single vectorized step, from the buffer of the column rather than from a copy of
+    its values. Missing values, i.e. masked or NaN values, are masked in the returned Time.
     """
     def __new__(cls, stc_time_coord):
-        # FIXME I can't figure out how to make astropy parse iso times as time columns, so I have to break
-        # them down and extract times
         date = stc_time_coord.date
-        if not isinstance(date, Quantity):
-            quantity = False
-            time = date.tolist()
-        else:
-            quantity = True
-            time = date
+        scale = _time_scale(stc_time_coord.frame)
+        t_format = _time_format(stc_time_coord)
 
         try:
-            scale = 'tt' if stc_time_coord.frame is None else stc_time_coord.frame.timescale.lower()
-            t_format = "isot" if isinstance(stc_time_coord, coordinates.ISOTime) else "jd"
-        except AttributeError:
-            scale = None
-            t_format = None
-
-        try:
-            # Astropy doesn't support nan in Time objects yet (should be coming in Astropy 3)
-            if not quantity:
-                time = nan_to_num(numpy.array(time))
+            if t_format == 'isot' and not isinstance(date, Quantity):
+                time = to_time(date, scale=scale)
             else:
-                time = nan_to_num(time)
-            time = Time(time, scale=scale, format=t_format)
-            time.name = stc_time_coord.date.name
+                time = Time(_masked_time_values(date), scale=scale, format=t_format)
+            time.name = date.name
             return time
         except AttributeError:
             return stc_time_coord
+
+
+# The time scale of each TimeFrame instance, which is usually shared by all the time coordinates of a document
+_TIME_SCALES = WeakKeyDictionary()
+
+
+def _time_scale(frame):
+    if frame is None:
+        return 'tt'
+    try:
+        return _TIME_SCALES[frame]
+    except KeyError:
+        pass
+    try:
+        scale = frame.timescale.lower()
+    except AttributeError:
+        scale = None
+    _TIME_SCALES[frame] = scale
+    return scale
+
+
+def _time_format(stc_time_coord):
+    # The coordinates model uses this adapter, so it can only be imported once the adapter module is loaded
+    from rama.models.coordinates import ISOTime, MJD
+
+    if isinstance(stc_time_coord, ISOTime):
+        return 'isot'
+    if isinstance(stc_time_coord, MJD):
+        return 'mjd'
+    return 'jd'
+
+
+def _masked_time_values(date):
+    # Return the values of date in days, as a numpy masked array if some of them are masked or not finite. The values
+    # are only copied if their unit is not days. Masked astropy quantities are recognized by their ``unmasked``
+    # attribute, as astropy.utils.masked is not available in the astropy releases that support Python 3.6.
+    unmasked = getattr(date, 'unmasked', None)
+    if unmasked is not None:
+        values, mask = unmasked, numpy.asarray(date.mask)
+    elif numpy.ma.isMaskedArray(date):
+        values, mask = date.data, numpy.ma.getmaskarray(date)
+    else:
+        values, mask = date, None
+
+    if isinstance(values, Quantity):
+        values = values.to_value(u.day)
+    values = numpy.asarray(values)
+
+    missing = ~numpy.isfinite(values)
+    if mask is not None:
+        missing |= mask
+    if missing.any():
+        return numpy.ma.MaskedArray(values, mask=missing, copy=False)
+    return values
@@ -20,7 +20,6 @@
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 from astropy import units as u
-from matplotlib import pyplot as plt
 
 from rama.models.measurements import GenericCoordMeasure, SkyPosition, StdTimeMeasure
 
@@ -84,6 +83,8 @@ class SkyPositionPlotter:
     MOLLWEIDE_TICKS = ['14h', '16h', '18h', '20h', '22h', '0h', '2h', '4h', '6h', '8h', '10h']
 
     def plot(self, instance, *args, **kwargs):
+        from matplotlib import pyplot as plt  # Only needed, and only paid for, when plotting
+
         ra = instance.measurement.ra.wrap_at(180 * u.Unit('degree'))
         dec = instance.measurement.dec
         fig = plt.figure()
@@ -122,6 +123,8 @@ def vo_axis_factory(axis):
 
 class CubePointPlotter:
     def plot(self, instance, x_name, y_name, *args, **kwargs):
+        from matplotlib import pyplot as plt  # Only needed, and only paid for, when plotting
+
         fig = plt.figure()
         ax = fig.add_subplot(111)
         ax.grid(True)
@@ -0,0 +1,148 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Read many documents in parallel.
+
+:py:func:`~read_many` reads each document in a worker process and materializes the instances of the requested model
+classes there, so that parsing and decoding run on as many cores as there are workers. A document that cannot be read
+does not stop the batch: its failure is reported in its :py:class:`~ReadResult`, along with the time spent on it.
+
+Instances are sent back to the caller with ``pickle``, so the requested classes must be importable by the workers.
+"""
+import logging
+import os
+import pickle
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rama.utils.registry import TypeRegistry
+
+LOG = logging.getLogger(__name__)
+
+
+class ReadResult:
+    """
+    The outcome of reading a single document: ``instances`` maps each requested class to the list of its instances in
+    the document, and ``elapsed`` is the wall-clock time in seconds spent reading it. If the document could not be
+    read, ``instances`` is ``None`` and ``error`` holds the exception, with its formatted ``traceback``. Exceptions
+    raised in a worker process that cannot be pickled are replaced by a :py:class:`~WorkerError`.
+    """
+    def __init__(self, path, instances=None, elapsed=None, error=None, traceback=None):
+        self.path = path
+        self.instances = instances
+        self.elapsed = elapsed
+        self.error = error
+        self.traceback = traceback
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __getitem__(self, cls):
+        return self.instances[cls]
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error!r}"
+        return f"<ReadResult {self.path} ({status})>"
+
+
+class WorkerError(Exception):
+    """
+    An exception raised in a worker process that could not be sent back to the caller. ``type_name`` is the name of
+    the type of the original exception, and ``traceback`` is its formatted traceback.
+    """
+    def __init__(self, type_name, message, traceback):
+        super().__init__(type_name, message, traceback)
+        self.type_name = type_name
+        self.message = message
+        self.traceback = traceback
+
+    def __str__(self):
+        return f"{self.type_name}: {self.message}"
+
+
+def read_many(paths, classes, workers=None, ordered=True, **kwargs):
+    """
+    Read the documents in ``paths`` and find the instances of each of the ``classes`` in them, using a pool of
+    ``workers`` processes (by default, one per CPU). Return an iterator over one :py:class:`~ReadResult` per path,
+    in the order of ``paths`` if ``ordered`` is true, or as soon as each document has been read otherwise.
+
+    With ``workers=1`` the documents are read one after the other in the current process. Additional keyword arguments
+    are passed to :py:func:`rama.read` for each document.
+    """
+    paths = list(paths)
+    classes = tuple(classes)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        return (_read_one(path, classes, kwargs) for path in paths)
+    return _read_in_pool(paths, classes, min(workers, max(len(paths), 1)), ordered, kwargs)
+
+
+def _read_in_pool(paths, classes, workers, ordered, kwargs):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_read_in_worker, path, classes, kwargs): path for path in paths}
+        for future in (futures if ordered else as_completed(futures)):
+            yield _get_result(future, futures[future])
+
+
+def _get_result(future, path):
+    try:
+        return future.result()
+    except Exception as exc:  # The worker died, or the result could not be sent back
+        LOG.warning(f"Cannot read {path}: {exc}")
+        return ReadResult(path, error=exc, traceback=traceback.format_exc())
+
+
+def _read_in_worker(path, classes, kwargs):
+    # Import the model packages before timing the document, so that the first document read by each worker is not
+    # charged for it. This only costs a lookup for the following documents.
+    TypeRegistry.instance.import_models()
+    result = _read_one(path, classes, kwargs)
+    if result.error is not None:
+        result.error = _picklable(result.error, result.traceback)
+    return result
+
+
+def _picklable(exc, formatted_traceback):
+    # Many parser exceptions hold unpicklable state, e.g. lxml's error log
+    try:
+        pickle.dumps(exc)
+    except Exception:
+        return WorkerError(type(exc).__name__, str(exc), formatted_traceback)
+    return exc
+
+
+def _read_one(path, classes, kwargs):
+    # rama imports this module
+    from rama import read
+
+    start = time.perf_counter()
+    try:
+        reader = read(path, **kwargs)
+        instances = reader.find_instances_many(classes)
+    except Exception as exc:
+        LOG.warning(f"Cannot read {path}: {exc}")
+        return ReadResult(path, elapsed=time.perf_counter() - start, error=exc, traceback=traceback.format_exc())
+    return ReadResult(path, instances, elapsed=time.perf_counter() - start)
@@ -19,6 +19,7 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import inspect
 
 
 class VodmlDescriptor:
@@ -51,3 +52,14 @@ class Attribute(VodmlDescriptor):
 
 class Reference(VodmlDescriptor):
     pass
+
+
+def is_field(attr):
+    return inspect.isdatadescriptor(attr) and isinstance(attr, VodmlDescriptor)
+
+
+def get_fields(cls):
+    """
+    Return the ``(name, descriptor)`` pairs of the VO-DML fields of a class, including inherited ones, sorted by name.
+    """
+    return tuple(inspect.getmembers(cls, is_field))
@@ -19,21 +19,29 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-from astropy import units as u
-from dateutil import parser
+from functools import lru_cache
 
+from astropy import units as u
+from rama.utils.isotime import parse_datetime
 from rama.utils.registry import VO
 
 
+@lru_cache(maxsize=1024)
+def parse_unit(unit):
+    """
+    Return the astropy unit for the ``unit`` string of a LITERAL or a FIELD, or ``dimensionless_unscaled`` if it cannot
+    be parsed. Parsing units with astropy is slow, and documents only use a handful of them, so they are cached.
+    """
+    try:
+        return u.Unit(unit)
+    except (ValueError, TypeError):
+        return u.dimensionless_unscaled
+
+
 @VO("ivoa:RealQuantity")
 class RealQuantity:
     def __new__(cls, value, unit):
-        value = float(value)
-        try:
-            quantity = value * u.Unit(unit)
-        except (ValueError, TypeError):
-            quantity = value * u.dimensionless_unscaled
-        return quantity
+        return u.Quantity(float(value), parse_unit(unit))
 
 
 @VO("ivoa:string")
@@ -57,4 +65,4 @@ class VOInteger:
 @VO("ivoa:datetime")
 class VODateTime:
     def __new__(cls, value, _):
-        return parser.parse(value)
+        return parse_datetime(value)
@@ -20,13 +20,19 @@
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 import logging
+import threading
 from abc import abstractmethod, ABCMeta
 from weakref import WeakValueDictionary
 
+from rama.reader.literals import LiteralConverter
+from rama.reader.query import make_conditions
+from rama.reader.rows import TemplateRows, is_template
 from rama.utils.registry import TypeRegistry
 
 LOG = logging.getLogger(__name__)
 
+_END = object()
+
 
 class Document(metaclass=ABCMeta):
     def __init__(self, file):
@@ -36,33 +42,223 @@ class Document(metaclass=ABCMeta):
     def find_instances(self, element_class, context):
         pass
 
+    def close(self):
+        """
+        Release the resources held by the document, e.g. a memory mapped file.
+        """
+
+    def iter_instances(self, types, context, conditions=()):
+        """
+        Iterate over the instances of the classes in ``types`` matching the ``conditions``. Documents that can build
+        instances one at a time should override this.
+        """
+        element_class = types[0]
+        return iter(self.find_instances_many({element_class: types}, context, conditions)[element_class])
+
+    def find_instances_many(self, classes, context, conditions=()):
+        """
+        ``classes`` maps each requested class to a tuple of the classes whose instances it should be given, i.e. the
+        class itself and possibly its subclasses. Return a dictionary mapping each requested class to the instances
+        matching all the ``conditions`` (see :py:mod:`rama.reader.query`).
+        """
+        return {element_class: [instance for cls in types for instance in self.find_instances(cls, context)
+                                if all(condition.test_instance(instance) for condition in conditions)]
+                for element_class, types in classes.items()}
+
 
 class Reader:
-    def __init__(self, document: Document):
+    """
+    Read model instances from a :py:class:`~Document`. A reader can be shared between threads: instances are built
+    by one thread at a time, so that referenced instances and decoded tables are only built once.
+
+    The instances of each class are only built the first time they are looked for: later calls to
+    :py:meth:`~find_instances` return the same instances, until :py:meth:`~invalidate` is called.
+
+    If ``intern_literals`` is true, equal LITERAL values are built once and shared by all the instances that use them,
+    see :py:mod:`rama.reader.literals`. If ``lazy_adapters`` is true, adapters are only applied when the adapted
+    objects are first used, and if ``raw`` is true they are not applied at all, see :py:mod:`rama.adapters`.
+    """
+    def __init__(self, document: Document, stats=None, intern_literals=False, lazy_adapters=False, raw=False):
         self.standalone_instances = WeakValueDictionary()
+        self.element_instances = {}
+        self.found_instances = {}
         self.tables = {}
         self.registry = TypeRegistry.instance
         self.document = document
+        self.stats = stats
+        self.literals = LiteralConverter(self.registry, intern=intern_literals, stats=stats)
+        self.lazy_adapters = lazy_adapters
+        self.raw = raw
+        self._lock = threading.RLock()
+        self._scanning = 0
 
     @property
     def file(self):
         return self.document.file
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Close the document. Instances that were already built can still be used, but tables that were not decoded yet
+        cannot be decoded anymore.
+        """
+        self.document.close()
+
     def get_type_by_id(self, type_id):
         return self.registry.get_by_id(type_id)
 
-    def find_instances(self, cls):
-        return self.document.find_instances(cls, context=self)
+    def get_field_plan(self, cls):
+        return self.registry.get_field_plan(cls)
+
+    def find_instances(self, cls, include_subclasses=False, where=None):
+        """
+        Return the instances of ``cls`` in the document. If ``include_subclasses`` is true, instances of the
+        registered subclasses of ``cls`` are returned too, in document order.
+
+        If ``where`` is given, only the instances whose attributes match it are returned, e.g.
+        ``where={'space_ref_frame': 'FK5'}``. See :py:mod:`rama.reader.query` for the supported conditions. Conditions
+        are evaluated before the instances are built whenever possible, so that non matching instances are never
+        built.
+        """
+        return self.find_instances_many([cls], include_subclasses, where)[cls]
+
+    def find_instances_many(self, classes, include_subclasses=False, where=None):
+        """
+        Return a dictionary mapping each of the ``classes`` to its instances in the document, as
+        :py:meth:`~find_instances` would.
+        """
+        conditions = make_conditions(where)
+        if self.stats is None:
+            with self._lock:
+                return self._find_instances_many(classes, include_subclasses, conditions)
+
+        with self._lock:
+            with self.stats.timer('find'):
+                found = self._find_instances_many(classes, include_subclasses, conditions)
+        self.stats.publish()
+        return found
+
+    def _find_instances_many(self, classes, include_subclasses, conditions):
+        found = {}
+        missing = {}
+        for cls in classes:
+            instances = self.found_instances.get((cls, include_subclasses), None)
+            if self.stats is not None:
+                self.stats.count_cache('found', instances is not None)
+            if instances is None:
+                missing[cls] = self.registry.get_subclasses(cls) if include_subclasses else (cls,)
+            elif conditions:
+                found[cls] = [instance for instance in instances
+                              if all(condition.test_instance(instance) for condition in conditions)]
+            else:
+                found[cls] = instances
+
+        if missing:
+            for cls, instances in self.document.find_instances_many(missing, self, conditions).items():
+                found[cls] = instances
+                if not conditions:
+                    self.found_instances[(cls, include_subclasses)] = instances
+
+        return {cls: list(found[cls]) for cls in classes}
+
+    def find_instances_iter(self, cls, include_subclasses=False, where=None):
+        """
+        Iterate over the instances that :py:meth:`~find_instances` would return, building them one at a time as the
+        iteration proceeds. Instances are neither memoized nor kept by the reader, unless they have an ID, so that
+        besides the parsed document and its index a scan only holds the instances the caller keeps. The document is
+        not modified: scans can be interleaved with each other and with :py:meth:`~find_instances`.
+        """
+        types = self.registry.get_subclasses(cls) if include_subclasses else (cls,)
+        instances = self.document.iter_instances(types, self, make_conditions(where))
+        while True:
+            with self._lock:
+                self._scanning += 1
+                try:
+                    instance = next(instances, _END)
+                finally:
+                    self._scanning -= 1
+            if instance is _END:
+                return
+            yield instance
+
+    def invalidate(self, cls=None):
+        """
+        Forget the instances of ``cls`` found so far, so that the next :py:meth:`~find_instances` call looks for them
+        again in the document. Instances that are still cached because they have an ID or are part of other found
+        instances are reused. If ``cls`` is ``None``, all the cached instances are discarded and the next calls build
+        new ones.
+        """
+        with self._lock:
+            if cls is not None:
+                self.found_instances.pop((cls, False), None)
+                self.found_instances.pop((cls, True), None)
+                return
+            self.found_instances.clear()
+            self.element_instances.clear()
+            self.standalone_instances.clear()
+
+    def find_templates(self, cls):
+        """
+        Return a :py:class:`~rama.reader.rows.TemplateRows` sequence for each templated instance of ``cls``.
+        """
+        return [TemplateRows(instance, self.registry) for instance in self.find_instances(cls)
+                if is_template(instance)]
+
+    def to_columns(self, cls, index=0):
+        """
+        Return a columnar view of the ``index``-th templated instance of ``cls``, as a QTable with a column for each
+        column-valued attribute, named by its dotted path in the instance. See
+        :py:meth:`~rama.reader.rows.TemplateRows.to_columns`.
+        """
+        return self.find_templates(cls)[index].to_columns()
+
+    def iter_rows(self, cls):
+        """
+        Iterate over the instances of ``cls`` one row at a time: templated instances yield one model instance per
+        table row, built lazily, while other instances are yielded as they are.
+        """
+        for instance in self.find_instances(cls):
+            if is_template(instance):
+                yield from TemplateRows(instance, self.registry)
+            else:
+                yield instance
+
+    def add_instance(self, instance, element=None):
+        """
+        Cache an instance by its ID if it has one, and otherwise by the document ``element`` it was built from.
+        """
+        with self._lock:
+            if instance.__vo_id__ is not None:
+                self.standalone_instances[instance.__vo_id__] = instance
+            elif element is not None and not self._scanning:
+                self.element_instances[element] = instance
 
-    def add_instance(self, instance):
-        if instance.__vo_id__ is not None:
-            self.standalone_instances[instance.__vo_id__] = instance
+    def get_instance_by_element(self, element):
+        with self._lock:
+            instance = self.element_instances.get(element, None)
+        if self.stats is not None:
+            self.stats.count_cache('elements', instance is not None)
+        return instance
 
     def get_instance_by_id(self, instance_id):
-        return self.standalone_instances.get(instance_id, None)
+        with self._lock:
+            instance = self.standalone_instances.get(instance_id, None)
+        if self.stats is not None:
+            self.stats.count_cache('instances', instance is not None)
+        return instance
 
     def add_table(self, table_id, table):
-        self.tables[table_id] = table
+        with self._lock:
+            self.tables[table_id] = table
 
     def get_table_by_id(self, table_id):
-        return self.tables.get(table_id, None)
+        with self._lock:
+            table = self.tables.get(table_id, None)
+        if self.stats is not None:
+            self.stats.count_cache('tables', table is not None)
+        return table
@@ -0,0 +1,217 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Persistent, opt-in cache of parsed documents.
+
+Reading a document means parsing its XML with lxml and decoding its tables with astropy. For documents that are read
+over and over, :py:class:`~ParseCache` stores the result of that work on disk: the document skeleton (i.e. the VO-DML
+annotation and the table metadata, without the table payloads) as a small XML file, and every decoded table column
+as a ``.npy`` file. On a warm read only the skeleton is parsed, and columns are memory mapped straight from the cache.
+
+Entries are keyed by a hash of the document content. For files on disk, the hash is remembered together with the
+file size and modification time, so that unchanged files are not hashed again. The total size of the cache can be
+bounded, in which case the least recently used entries are evicted.
+
+Cache entries are written with ``pickle`` and ``numpy.save``, so a cache directory should only be shared with
+trusted processes.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy
+from astropy.table import Column, MaskedColumn, Table
+
+LOG = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+class ParseCache:
+    """
+    A cache of parsed documents in ``directory``. If ``max_size`` is not ``None``, the least recently used entries are
+    removed whenever the total size of the cache exceeds ``max_size`` bytes.
+    """
+    SKELETON = 'skeleton.xml'
+    TABLES = 'tables.pickle'
+
+    def __init__(self, directory, max_size=None):
+        self.directory = os.path.abspath(directory)
+        self.max_size = max_size
+        os.makedirs(self._stat_directory, exist_ok=True)
+
+    @property
+    def _stat_directory(self):
+        return os.path.join(self.directory, 'stat')
+
+    def get_key(self, source, path=None):
+        """
+        Return the cache key for a :py:class:`~rama.reader.source.Source`. If the source was read from ``path``, the
+        content hash is only computed again if the size or modification time of the file changed.
+        """
+        if path is None:
+            return self._hash(source)
+
+        stat = os.stat(path)
+        path_id = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        stat_file = os.path.join(self._stat_directory, f"{path_id}.json")
+        try:
+            with open(stat_file) as file:
+                memo = json.load(file)
+            if memo['size'] == stat.st_size and memo['mtime'] == stat.st_mtime_ns:
+                return memo['key']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        key = self._hash(source)
+        self._write_atomically(stat_file, json.dumps({'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'key': key}))
+        return key
+
+    @staticmethod
+    def _hash(source):
+        digest = hashlib.blake2b(source.buffer, digest_size=20).hexdigest()
+        return f"v{CACHE_VERSION}-{digest}"
+
+    def load(self, key):
+        """
+        Return the ``(skeleton, tables)`` pair stored for ``key``, or ``None`` on a cache miss. ``skeleton`` is the
+        serialized XML skeleton, and ``tables`` a dictionary mapping table positions to astropy tables whose columns
+        are memory mapped from the cache.
+        """
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, self.SKELETON), 'rb') as file:
+                skeleton = file.read()
+            with open(os.path.join(entry, self.TABLES), 'rb') as file:
+                headers = pickle.load(file)
+            tables = {position: self._load_table(entry, header) for position, header in headers.items()}
+            # Another process may evict the entry at any time, which is a cache miss like any other
+            os.utime(entry)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError) as exc:
+            if os.path.isdir(entry):
+                LOG.warning(f"Ignoring unreadable cache entry {entry}: {exc}")
+            return None
+
+        return skeleton, tables
+
+    def store(self, key, skeleton, tables):
+        """
+        Store the XML ``skeleton`` (bytes) and the ``tables`` (a dictionary mapping table positions to astropy tables)
+        of a document under ``key``.
+        """
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            return
+
+        staging = tempfile.mkdtemp(dir=self.directory, prefix='.staging-')
+        try:
+            with open(os.path.join(staging, self.SKELETON), 'wb') as file:
+                file.write(skeleton)
+            headers = {position: self._store_table(staging, position, table) for position, table in tables.items()}
+            with open(os.path.join(staging, self.TABLES), 'wb') as file:
+                pickle.dump(headers, file)
+            os.rename(staging, entry)
+        except OSError as exc:
+            if not os.path.isdir(entry):  # Otherwise another process stored the same entry first
+                LOG.warning(f"Cannot store cache entry {entry}: {exc}")
+        finally:
+            if os.path.isdir(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is no larger than ``max_size``.
+        """
+        if self.max_size is None:
+            return
+
+        entries = []
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if name.startswith('v') and os.path.isdir(entry):
+                entries.append((os.stat(entry).st_mtime, _directory_size(entry), entry))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self._stat_directory, exist_ok=True)
+
+    @staticmethod
+    def _store_table(entry, position, table):
+        columns = []
+        for index, column in enumerate(table.itercols()):
+            data = numpy.ma.getdata(column)
+            mask = numpy.ma.getmaskarray(column) if isinstance(column, MaskedColumn) else None
+            numpy.save(os.path.join(entry, f"{position}-{index}.npy"), data, allow_pickle=data.dtype.hasobject)
+            if mask is not None:
+                numpy.save(os.path.join(entry, f"{position}-{index}.mask.npy"), mask)
+            columns.append({
+                'name': column.info.name,
+                'unit': column.info.unit,
+                'description': column.info.description,
+                'format': column.info.format,
+                'meta': column.info.meta,
+                'masked': mask is not None,
+                'pickled': data.dtype.hasobject,
+            })
+        return {'position': position, 'meta': table.meta, 'columns': columns}
+
+    @staticmethod
+    def _load_table(entry, header):
+        columns = []
+        for index, info in enumerate(header['columns']):
+            prefix = os.path.join(entry, f"{header['position']}-{index}")
+            if info['pickled']:
+                data = numpy.load(f"{prefix}.npy", allow_pickle=True)
+            else:
+                # Copy-on-write mapping: columns can be modified in memory without touching the cache
+                data = numpy.load(f"{prefix}.npy", mmap_mode='c')
+            kwargs = {key: info[key] for key in ('name', 'unit', 'description', 'format', 'meta')}
+            if info['masked']:
+                column = MaskedColumn(data, mask=numpy.load(f"{prefix}.mask.npy", mmap_mode='c'), copy=False, **kwargs)
+            else:
+                column = Column(data, copy=False, **kwargs)
+            columns.append(column)
+        return Table(columns, meta=header['meta'], copy=False)
+
+    @staticmethod
+    def _write_atomically(path, content):
+        descriptor, staging = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(descriptor, 'w') as file:
+            file.write(content)
+        os.replace(staging, path)
+
+
+def _directory_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
@@ -0,0 +1,75 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Conversion of LITERAL values, e.g. ``<LITERAL value="1.5" dmtype="ivoa:RealQuantity" unit="deg"/>``, into Python
+values.
+
+A :py:class:`~LiteralConverter` looks up the class of each dmtype in the type registry only once per reader. It can
+also intern literals: equal literals, i.e. with the same dmtype, value and unit, are then built once and the same
+value is returned for all of them, which saves both time and memory for documents that repeat the same constants many
+times over. Only immutable values are interned, and interned quantities are made read-only, so that changing one of
+them in place raises an error rather than changing all the others.
+"""
+from datetime import date, datetime, time
+
+import numpy
+
+_IMMUTABLE = (str, int, float, complex, bytes, date, datetime, time)
+
+
+class LiteralConverter:
+    """
+    Build literal values for a reader. If ``intern`` is true, equal literals share the same value. When ``stats`` is
+    given, the hits and misses of the interned literals are counted as the ``literals`` cache.
+    """
+    def __init__(self, registry, intern=False, stats=None):
+        self.registry = registry
+        self.intern = intern
+        self.stats = stats
+        self._constructors = {}
+        self._interned = {}
+
+    def convert(self, dmtype, value, unit):
+        constructor = self._constructors.get(dmtype)
+        if constructor is None:
+            constructor = self._constructors[dmtype] = self.registry.get_by_id(dmtype)
+
+        if not self.intern:
+            return constructor(value, unit)
+
+        key = (dmtype, value, unit)
+        literal = self._interned.get(key)
+        if self.stats is not None:
+            self.stats.count_cache('literals', literal is not None)
+        if literal is None:
+            literal = constructor(value, unit)
+            if _freeze(literal):
+                self._interned[key] = literal
+        return literal
+
+
+def _freeze(literal):
+    # Return True if the literal can safely be shared
+    if isinstance(literal, numpy.ndarray):
+        literal.flags.writeable = False
+        return True
+    return isinstance(literal, _IMMUTABLE)
@@ -0,0 +1,79 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Predicates for :py:meth:`~rama.reader.Reader.find_instances`.
+
+A ``where`` dictionary maps attribute paths, i.e. the Python names of the fields of the requested class, possibly
+dotted to reach into nested or referenced instances (e.g. ``'coord.frame.space_ref_frame'``), to the value the
+attribute must have. A callable, e.g. a :py:class:`~Range`, can be used instead of a value: it is called with the
+attribute value and returns whether the instance matches.
+
+Documents evaluate the conditions against the raw annotation when they can, before building any instance. When a
+condition depends on something only known once the instance is built, e.g. a table column, the instance is built and
+the condition is evaluated on its attributes instead.
+"""
+import numpy
+
+UNKNOWN = object()
+
+
+class Range:
+    """
+    A predicate matching values between ``min`` and ``max``, both included. Either bound can be omitted. Missing
+    values, i.e. absent optional attributes, never match.
+    """
+    def __init__(self, min=None, max=None):
+        self.min = min
+        self.max = max
+
+    def __call__(self, value):
+        if value is None or value is numpy.ma.masked:
+            return False
+        return (self.min is None or value >= self.min) and (self.max is None or value <= self.max)
+
+    def __repr__(self):
+        return f"Range(min={self.min!r}, max={self.max!r})"
+
+
+class Condition:
+    def __init__(self, path, expected):
+        self.path = tuple(path.split('.'))
+        self.expected = expected
+
+    def test(self, value):
+        if callable(self.expected):
+            result = self.expected(value)
+        else:
+            result = value == self.expected
+        return bool(numpy.all(result))
+
+    def test_instance(self, instance):
+        value = instance
+        for name in self.path:
+            value = getattr(getattr(value, '__vo_object__', value), name, None)
+        return self.test(value)
+
+
+def make_conditions(where):
+    if not where:
+        return ()
+    return tuple(Condition(path, expected) for path, expected in where.items())
@@ -0,0 +1,138 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Row-wise views over templated instances.
+
+An instance read from a ``TEMPLATES`` block is a single object whose attributes are whole table columns. The
+:py:class:`~TemplateRows` sequence exposes it as one lightweight model instance per table row instead. Rows are
+built on demand, from the columns already decoded by the reader, so iterating over a large template only holds one
+row at a time.
+
+Rows are plain model instances: adapters are not applied to them, and templated values wrapped by an adapter are
+replaced by the original model instance they were built from. Non templated values, e.g. referenced frames, are
+shared by all rows.
+
+:py:meth:`~TemplateRows.to_columns` provides the opposite, columnar view: a table with one column per templated
+attribute, named after its path in the model instance.
+"""
+from collections.abc import Sequence
+
+import numpy
+from astropy.table import QTable
+
+from rama.utils.registry import TypeRegistry
+
+
+def is_template(instance):
+    if hasattr(instance, "__vo_object__"):
+        return is_template(instance.__vo_object__)
+
+    if hasattr(instance, "is_template"):
+        return instance.is_template
+
+    return False
+
+
+def _unwrap(value):
+    return getattr(value, '__vo_object__', value)
+
+
+def _is_column(value):
+    return isinstance(value, numpy.ndarray) and value.ndim > 0
+
+
+class TemplateRows(Sequence):
+    """
+    A read-only sequence with one model instance per row of a templated instance.
+    """
+    def __init__(self, template, registry=None):
+        self.template = _unwrap(template)
+        self.registry = registry if registry is not None else TypeRegistry.instance
+        self._length = self._count_rows(self.template)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Row index out of range: {index}")
+        return self._make_row(self.template, index)
+
+    def to_columns(self):
+        """
+        Return a QTable with a column for each column-valued attribute of the template, named by its dotted path
+        (e.g. ``coord.ra`` or ``luminosity[0].value``). Columns are views on the data decoded by the reader, not
+        copies.
+        """
+        columns = {}
+        self._collect_columns(self.template, '', columns)
+        return QTable(columns, copy=False)
+
+    def _collect_columns(self, value, path, columns):
+        if isinstance(value, list):
+            for position, item in enumerate(value):
+                self._collect_columns(item, f"{path}[{position}]", columns)
+            return
+        value = _unwrap(value)
+        if _is_column(value):
+            columns[path] = value
+        elif is_template(value):
+            prefix = f"{path}." if path else ''
+            for field_name, field_value in self._fields(value):
+                self._collect_columns(field_value, prefix + field_name, columns)
+
+    def _fields(self, instance):
+        for field_name, _ in self.registry.get_field_plan(type(instance)):
+            yield field_name, getattr(instance, field_name)
+
+    def _count_rows(self, instance):
+        for _, value in self._fields(instance):
+            for item in value if isinstance(value, list) else [value]:
+                item = _unwrap(item)
+                if _is_column(item):
+                    return len(item)
+                if is_template(item):
+                    n_rows = self._count_rows(item)
+                    if n_rows:
+                        return n_rows
+        return 0
+
+    def _make_row(self, instance, index):
+        row = type(instance)()
+        row.is_template = False
+        for field_name, value in self._fields(instance):
+            setattr(row, field_name, self._row_value(value, index))
+        return row
+
+    def _row_value(self, value, index):
+        if isinstance(value, list):
+            return [self._row_value(item, index) for item in value]
+        unwrapped = _unwrap(value)
+        if _is_column(unwrapped):
+            return unwrapped[index]
+        if is_template(unwrapped):
+            return self._make_row(unwrapped, index)
+        return value
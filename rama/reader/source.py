@@ -0,0 +1,175 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Document sources shared by the parsers that consume them.
+
+A document is usually read more than once: lxml parses the VO-DML annotation, and astropy decodes the tables. The
+:py:class:`~Source` class reads the document only once, memory mapping it if it is a file on disk, and hands out
+independent read-only file-like views over the same buffer. The memory map is released when the source is closed.
+Gzip-compressed documents are decompressed, a chunk at a time, into a temporary file that is memory mapped in turn.
+Remote documents are downloaded once, and file-like objects are read once, into memory.
+"""
+import gzip
+import io
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+DECOMPRESSION_CHUNK_SIZE = 1 << 20
+
+# The encoding declared in the XML declaration of a document
+_DECLARED_ENCODING = re.compile(r'^\s*<\?xml[^>]*?\sencoding\s*=\s*["\']([A-Za-z][A-Za-z0-9._-]*)["\']')
+
+
+class Source:
+    """
+    The content of a document, read once. ``file`` may be a path, a URL, a file-like object opened in binary or text
+    mode, or a bytes-like object holding the document itself. The path of the document is available as ``path`` if
+    ``file`` is a local path, and is ``None`` otherwise.
+    """
+    def __init__(self, file):
+        self.path = None
+        if isinstance(file, (str, os.PathLike)):
+            if _is_url(file):
+                with urlopen(os.fspath(file)) as response:
+                    self.buffer = response.read()
+            else:
+                self.path = file
+                self.buffer = self._map(file)
+        elif hasattr(file, 'read'):
+            content = file.read()
+            self.buffer = _encode(content) if isinstance(content, str) else content
+        else:
+            self.buffer = file
+
+        if self.buffer[:2] == GZIP_MAGIC:
+            compressed = self.buffer
+            self.buffer = self._decompress(compressed)
+            if isinstance(compressed, mmap.mmap):
+                compressed.close()
+
+    @classmethod
+    def _map(cls, path):
+        with open(path, 'rb') as file:
+            return cls._map_file(file)
+
+    @staticmethod
+    def _map_file(file):
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            return b''
+
+    @classmethod
+    def _decompress(cls, compressed):
+        # The temporary file is deleted when it is closed, but its content stays mapped until the map is closed
+        with tempfile.TemporaryFile() as file:
+            with BufferReader(compressed) as reader, gzip.GzipFile(fileobj=reader) as decompressed:
+                shutil.copyfileobj(decompressed, file, DECOMPRESSION_CHUNK_SIZE)
+            file.flush()
+            return cls._map_file(file)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map of the document, if any. The views opened with :py:meth:`~open` must be closed first.
+        """
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def open(self):
+        """
+        Return a new binary file-like object reading from the start of the shared buffer.
+        """
+        return BufferReader(self.buffer)
+
+
+def _is_url(path):
+    # Windows drive letters are parsed as one letter schemes
+    return len(urlparse(os.fspath(path)).scheme) > 1
+
+
+def _encode(content):
+    # Encode text with the encoding declared by the document, if any, so that the declaration still holds
+    match = _DECLARED_ENCODING.match(content)
+    encoding = match.group(1) if match else 'utf-8'
+    return content.encode(encoding, errors='xmlcharrefreplace')
+
+
+class BufferReader(io.RawIOBase):
+    """
+    A read-only, seekable file-like view over a buffer. The buffer is not copied.
+    """
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        start = min(self._position, len(self._view))
+        end = min(start + len(buffer), len(self._view))
+        size = end - start
+        buffer[:size] = self._view[start:end]
+        self._position = end
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
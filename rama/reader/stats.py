@@ -0,0 +1,141 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Opt-in instrumentation of readers.
+
+A :py:class:`~ReaderStats` instance passed to :py:func:`rama.read` records how much time is spent in each phase of
+reading a document, and how many times each phase was entered:
+
+- ``parse``: parsing the document XML with lxml (or loading it from the parse cache);
+- ``index``: indexing the VO-DML annotation;
+- ``find``: finding instances, which includes all the phases below;
+- ``lookup``: looking up roles, references and columns in the annotation index;
+- ``decode``: decoding tables with astropy;
+- ``literal``: building literal values, e.g. quantities;
+- ``adapter``: applying adapters, e.g. building astropy ``SkyCoord`` instances.
+
+It also counts the instances built for each VO-DML type, and the hits and misses of the caches of the reader for
+standalone instances and decoded tables. When the stats are not enabled, none of this costs anything.
+"""
+import time
+from collections import Counter
+from functools import wraps
+
+PHASES = ('parse', 'index', 'find', 'lookup', 'decode', 'literal', 'adapter')
+
+
+class ReaderStats:
+    """
+    Timings and counters for a reader. If ``callback`` is not ``None``, it is called with :py:meth:`~as_dict` every
+    time the reader is done finding instances.
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.times = Counter()
+        self.calls = Counter()
+        self.instances = Counter()
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+
+    def timer(self, phase):
+        return _Timer(self, phase)
+
+    def record(self, phase, elapsed):
+        self.times[phase] += elapsed
+        self.calls[phase] += 1
+
+    def timed(self, phase, function):
+        """
+        Return a wrapper of ``function`` recording its calls as ``phase``.
+        """
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(phase, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(self, target, phase, *method_names):
+        """
+        Replace the methods ``method_names`` of the ``target`` instance with wrappers recording their calls as
+        ``phase``. The class of ``target`` is left alone.
+        """
+        for name in method_names:
+            setattr(target, name, self.timed(phase, getattr(target, name)))
+        return target
+
+    def count_instance(self, vodml_id):
+        self.instances[vodml_id] += 1
+
+    def count_cache(self, cache, hit):
+        (self.cache_hits if hit else self.cache_misses)[cache] += 1
+
+    def as_dict(self):
+        return {
+            'phases': {phase: {'time': self.times[phase], 'calls': self.calls[phase]}
+                       for phase in PHASES if self.calls[phase]},
+            'instances': dict(self.instances),
+            'caches': {cache: {'hits': self.cache_hits[cache], 'misses': self.cache_misses[cache]}
+                       for cache in sorted(set(self.cache_hits) | set(self.cache_misses))},
+        }
+
+    def publish(self):
+        if self.callback is not None:
+            self.callback(self.as_dict())
+
+    def reset(self):
+        for counter in (self.times, self.calls, self.instances, self.cache_hits, self.cache_misses):
+            counter.clear()
+
+
+def phase_timer(stats, phase):
+    """
+    Return a context manager timing ``phase`` if ``stats`` is not ``None``, and doing nothing otherwise.
+    """
+    return _NULL_TIMER if stats is None else stats.timer(phase)
+
+
+class _Timer:
+    def __init__(self, stats, phase):
+        self.stats = stats
+        self.phase = phase
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.record(self.phase, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
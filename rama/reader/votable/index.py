@@ -0,0 +1,122 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Lookup tables over the VO-DML annotation and the table skeleton of a VOTable document.
+"""
+from collections import defaultdict
+
+from rama.reader.votable.utils import get_local_name, get_roles
+
+
+class AnnotationIndex:
+    """
+    Index of a parsed VOTable document, built with a single traversal of the tree when the document is opened.
+
+    It maps dmtype values to the ``INSTANCE`` elements that declare them, in document order, ``INSTANCE`` IDs to the
+    corresponding elements, and ``FIELD`` IDs to the ``FIELD`` element, its parent ``TABLE`` and the position of that
+    table in the document. Tables are numbered as astropy numbers them: the tables of a ``RESOURCE`` come before the
+    tables of its nested ``RESOURCE`` elements.
+    """
+    def __init__(self, root):
+        self.tables = _tables_in_astropy_order(root)
+        table_positions = {table: position for position, table in enumerate(self.tables)}
+        self._instances_by_type = defaultdict(list)
+        self._instance_positions = {}
+        self._instances_by_id = {}
+        self._fields_by_id = {}
+        self._roles = {}
+
+        for element in root.iter('{*}INSTANCE', '{*}FIELD'):
+            if get_local_name(element) == 'INSTANCE':
+                self._add_instance(element)
+            else:
+                self._add_field(element, table_positions)
+
+    def _add_instance(self, element):
+        type_id = element.get('dmtype')
+        if type_id is not None:
+            self._instances_by_type[type_id].append(element)
+            self._instance_positions[element] = len(self._instance_positions)
+        instance_id = element.get('ID')
+        if instance_id is not None:
+            self._instances_by_id.setdefault(instance_id, element)
+
+    def _add_field(self, element, table_positions):
+        field_id = element.get('ID')
+        if field_id is None or field_id in self._fields_by_id:
+            return
+        table_element = element.getparent()
+        table_position = table_positions.get(table_element, None)
+        if table_position is None:
+            table_element = None
+        self._fields_by_id[field_id] = (element, table_element, table_position)
+
+    def find_instances_by_type(self, type_id):
+        return list(self._instances_by_type.get(type_id, ()))
+
+    def find_instances_by_types(self, type_ids):
+        """
+        Return the ``INSTANCE`` elements declaring any of the given dmtypes, in document order.
+        """
+        if len(type_ids) == 1:
+            return self.find_instances_by_type(type_ids[0])
+        elements = [element for type_id in type_ids for element in self._instances_by_type.get(type_id, ())]
+        return sorted(elements, key=self._instance_positions.__getitem__)
+
+    def find_instance_by_id(self, instance_id):
+        return self._instances_by_id.get(instance_id, None)
+
+    def find_field(self, field_id):
+        """
+        Return a ``(FIELD, TABLE, table position)`` tuple for the given FIELD ID, or ``None`` if there is no such
+        FIELD. TABLE and position are ``None`` if the FIELD does not have a TABLE parent.
+        """
+        return self._fields_by_id.get(field_id, None)
+
+    def find_element_for_role(self, xml_element, tag_name, role_id):
+        """
+        Return the child of ``xml_element`` with the given tag name and dmrole, or ``None``. The children of each
+        element are indexed by role the first time one of its roles is looked up.
+        """
+        roles = self._roles.get(xml_element, None)
+        if roles is None:
+            roles = self._roles[xml_element] = get_roles(xml_element)
+        return roles.get((tag_name, role_id), None)
+
+    def forget_roles(self, xml_element):
+        """
+        Drop the roles indexed for ``xml_element`` and its descendants. They are indexed again if they are looked up
+        later on.
+        """
+        roles = self._roles
+        for element in xml_element.iter():
+            roles.pop(element, None)
+
+
+def _tables_in_astropy_order(element, tables=None):
+    # astropy yields the TABLE children of a RESOURCE, then the tables of its nested RESOURCE elements, recursively
+    if tables is None:
+        tables = []
+    tables.extend(element.iterchildren('{*}TABLE'))
+    for resource in element.iterchildren('{*}RESOURCE'):
+        _tables_in_astropy_order(resource, tables)
+    return tables
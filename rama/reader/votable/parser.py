@@ -19,41 +19,152 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-import inspect
 import logging
 import warnings
 
 from lxml import etree
 
-from astropy.table import QTable
+from astropy.table import QTable, Table
 from astropy.io import votable
 
 import numpy
 
-from rama.framework import Attribute, Reference, Composition, VodmlDescriptor
+from rama.adapters import LazyAdapter
+from rama.framework import Attribute, Reference, Composition
 from rama.reader import Document
-from rama.reader.votable.utils import get_children, get_local_name, \
-    get_type_xpath_expression, resolve_id, resolve_type, find_element_for_role
+from rama.reader.cache import ParseCache
+from rama.reader.query import UNKNOWN
+from rama.reader.source import Source
+from rama.reader.stats import phase_timer
+from rama.reader.votable.index import AnnotationIndex
+from rama.reader.votable.utils import get_children, has_descendant, resolve_id, resolve_type
 
 LOG = logging.getLogger(__name__)
 
 
 class Votable(Document):
-    def __init__(self, xml):
+    # Elements holding the table payloads, which are decoded by astropy and never needed in the annotation tree.
+    PAYLOAD_TAGS = ('{*}TR', '{*}STREAM')
+
+    def __init__(self, xml, streaming=False, cache_dir=None, cache_size=None, stats=None):
         super().__init__(xml)
+        self.streaming = streaming
+        self.stats = stats
+        self.source = Source(xml)
         self.parser = Parser(self)
         self.document = None
-        self._open_document(xml)
+        self.index = None
+        self._votable_tables = None
+        self._tables = {}
+        with phase_timer(stats, 'parse'):
+            if cache_dir is None:
+                with self.source.open() as xml_document:
+                    self._open_document(xml_document)
+            else:
+                self._open_cached_document(ParseCache(cache_dir, max_size=cache_size), self.source.path)
+        with phase_timer(stats, 'index'):
+            self.index = AnnotationIndex(self.document)
+
+        if stats is not None:
+            stats.instrument(self.index, 'lookup', 'find_element_for_role', 'find_instance_by_id', 'find_field')
+            stats.instrument(self, 'decode', 'decode_table')
 
     def _open_document(self, xml_document):
-        # TBD Maybe I should remove TABLEDATA to reduce the size of the tree. TABLEDATA will be parsed by astropy.
+        if self.streaming:
+            self.document = self._stream_document(xml_document)
+            return
+
         parser = etree.XMLParser(ns_clean=True)
         tree = etree.parse(xml_document, parser)
         self.document = tree.getroot()
 
+    def _open_cached_document(self, cache, path):
+        """
+        Read the document skeleton and the decoded tables from the cache. On a cache miss, the document is streamed,
+        all of its tables are decoded, and both are stored in the cache for the next read.
+        """
+        key = cache.get_key(self.source, path)
+        entry = cache.load(key)
+        if entry is not None:
+            skeleton, self._tables = entry
+            self.document = etree.fromstring(skeleton, etree.XMLParser(huge_tree=True))
+            return
+
+        with self.source.open() as xml_document:
+            self.document = self._stream_document(xml_document)
+        self._tables = self._decode_all_tables()
+        cache.store(key, etree.tostring(self.document), self._tables)
+
+    def _decode_all_tables(self):
+        tables = self._decode_tables()
+        for table_index in range(len(self.document.findall('.//{*}TABLE'))):
+            if table_index in tables:
+                continue
+            try:
+                tables[table_index] = self._decode_single_table(table_index)
+            except ValueError as exc:
+                LOG.warning(f"Cannot decode table {table_index}: {exc}")
+        return {table_index: _to_table(votable_table) for table_index, votable_table in tables.items()}
+
+    def _stream_document(self, xml_document):
+        """
+        Parse the document incrementally, dropping table rows and binary streams as soon as they have been read, so
+        that only the VODML annotation and the RESOURCE/TABLE/FIELD skeleton are kept in memory. The document itself is
+        memory mapped if it is a file, compressed or not, but URLs and file-like objects are read into memory first.
+        """
+        events = etree.iterparse(xml_document, events=('end',), tag=self.PAYLOAD_TAGS,
+                                 remove_comments=True, huge_tree=True)
+        for _, element in events:
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return events.root
+
+    def decode_table(self, table_index):
+        """
+        Return the table at the given position in the document as a QTable. All the tables in the document are decoded
+        by astropy in a single pass the first time a table is requested. If some table cannot be decoded, tables are
+        decoded one at a time instead. Tables read from the cache are not decoded at all.
+        """
+        if table_index in self._tables:
+            return QTable(self._tables[table_index], copy=False)
+
+        if self._votable_tables is None:
+            self._votable_tables = self._decode_tables()
+
+        votable_table = self._votable_tables.get(table_index, None)
+        if votable_table is None:
+            votable_table = self._decode_single_table(table_index)
+        return QTable(_to_table(votable_table), copy=False)
+
+    def close(self):
+        """
+        Release the document source. Tables that were not decoded yet cannot be decoded anymore.
+        """
+        self.source.close()
+
+    def _decode_single_table(self, table_index):
+        with self.source.open() as file:
+            return votable.parse_single_table(file, table_number=table_index)
+
+    def _decode_tables(self):
+        try:
+            with self.source.open() as file:
+                return dict(enumerate(votable.parse(file).iter_tables()))
+        except ValueError as exc:
+            LOG.warning(f"Cannot decode all tables in a single pass: {exc}")
+            return {}
+
     def find_instances(self, element_class, context):
         return self.parser.find_instances(element_class, context)
 
+    def find_instances_many(self, classes, context, conditions=()):
+        return {element_class: self.parser.find_instances_of_types(types, context, conditions)
+                for element_class, types in classes.items()}
+
+    def iter_instances(self, types, context, conditions=()):
+        return self.parser.iter_instances_of_types(types, context, conditions)
+
 
 class Parser:
     def __init__(self, votable_file):
@@ -63,10 +174,87 @@ class Parser:
             Reference: self.parse_references,
             Composition: self.parse_composed_instances
         }
+        self.field_tags = {
+            Attribute: AttributeElement.TAG_NAME,
+            Reference: ReferenceElement.TAG_NAME,
+            Composition: CompositionElement.TAG_NAME
+        }
 
     def find_instances(self, element_class, context):
         return [self.read_instance(element, context) for element in self.find(element_class)]
 
+    def find_instances_of_types(self, element_classes, context, conditions=()):
+        elements = self.votable.index.find_instances_by_types([cls.vodml_id for cls in element_classes])
+        if not conditions:
+            return [self.read_instance(element, context) for element in elements]
+        return list(self.iter_instances_of_types(element_classes, context, conditions))
+
+    def iter_instances_of_types(self, element_classes, context, conditions=()):
+        """
+        Yield the instances of the given classes matching the ``conditions`` one at a time, as they are built. The
+        document is left untouched, so that any number of scans and queries can run over it at the same time. Only
+        the roles indexed while reading each element are dropped once it has been read, since a scan visits every
+        element once.
+        """
+        index = self.votable.index
+        for element in index.find_instances_by_types([cls.vodml_id for cls in element_classes]):
+            pending = self.match(element, conditions, context)
+            if pending is not None:
+                instance = self.read_instance(element, context)
+            index.forget_roles(element)
+            if pending is not None and all(condition.test_instance(instance) for condition in pending):
+                yield instance
+
+    def match(self, xml_element, conditions, context):
+        """
+        Evaluate the ``conditions`` against the annotation of ``xml_element``. Return ``None`` if some condition is
+        not met, and otherwise the list of conditions that can only be evaluated on the built instance.
+        """
+        pending = []
+        for condition in conditions:
+            value = self.read_raw_value(xml_element, condition.path, context)
+            if value is UNKNOWN:
+                pending.append(condition)
+            elif not condition.test(value):
+                return None
+        return pending
+
+    def read_raw_value(self, xml_element, path, context):
+        """
+        Return the value of the attribute at ``path`` from the LITERALs in the annotation, following nested and
+        referenced instances, without building any instance. Return ``UNKNOWN`` if the value is not a literal.
+        """
+        index = self.votable.index
+        for position, field_name in enumerate(path):
+            if xml_element is None:
+                return None
+            element_class = context.get_type_by_id(resolve_type(xml_element))
+            field_object = dict(context.get_field_plan(element_class)).get(field_name, None)
+            if field_object is None:
+                return UNKNOWN
+
+            tag_name = self.field_tags[field_object.__class__]
+            role_element = index.find_element_for_role(xml_element, tag_name, field_object.vodml_id)
+            if role_element is None:
+                return None
+
+            if isinstance(field_object, Reference):
+                children = [index.find_instance_by_id(idref.text) for idref in get_children(role_element, "IDREF")]
+            else:
+                children = list(get_children(role_element, "INSTANCE"))
+
+            if position < len(path) - 1:
+                if len(children) != 1:
+                    return UNKNOWN
+                xml_element = children[0]
+            elif children or has_descendant(role_element, "COLUMN"):
+                return UNKNOWN
+            else:
+                values = [make_literal(element, context) for element in get_children(role_element, "LITERAL")]
+                if field_object.max == 1:
+                    return values[0] if len(values) == 1 else (None if not values else values)
+                return values
+
     def read_instance(self, xml_element, context):
         type_id = resolve_type(xml_element)
         element_class = context.get_type_by_id(type_id)
@@ -82,39 +270,47 @@ class Parser:
         return ReferenceElement(xml_element, field_object, context, self).all
 
     def find(self, element_class):
-        type_id = element_class.vodml_id
-        elements = self.votable.document.xpath(get_type_xpath_expression('INSTANCE', type_id))
-        return elements
+        return self.votable.index.find_instances_by_type(element_class.vodml_id)
 
     def make(self, instance_class, xml_element, context):
         instance_id = resolve_id(xml_element)
 
-        instance = context.get_instance_by_id(instance_id)
+        if instance_id is not None:
+            instance = context.get_instance_by_id(instance_id)
+        else:
+            # Anonymous elements are cached by identity: lxml keeps returning the same proxy for an element as long
+            # as it is referenced, here by the cache key itself.
+            instance = context.get_instance_by_element(xml_element)
         if instance is not None:
             return instance
 
         instance = instance_class()
         instance.is_template = self.is_template(xml_element)
 
-        def is_field(attr):
-            return inspect.isdatadescriptor(attr) and isinstance(attr, VodmlDescriptor)
-
-        fields = inspect.getmembers(instance_class, is_field)
-        for field_name, field_object in fields:
+        for field_name, field_object in context.get_field_plan(instance_class):
             field_reader = self.field_readers[field_object.__class__]
             setattr(instance, field_name, field_reader(xml_element, field_object, context))
 
-        if hasattr(instance_class, '__delegate__'):
+        stats = context.stats
+        if stats is not None:
+            stats.count_instance(instance_class.vodml_id)
+
+        if hasattr(instance_class, '__delegate__') and not context.raw:
             vo_instance = instance
-            instance = instance_class.__delegate__(vo_instance)
-            instance.__vo_object__ = vo_instance
+            if context.lazy_adapters:
+                adapter = instance_class.__delegate__
+                instance = LazyAdapter(adapter if stats is None else stats.timed('adapter', adapter), vo_instance)
+            else:
+                with phase_timer(stats, 'adapter'):
+                    instance = instance_class.__delegate__(vo_instance)
+                instance.__vo_object__ = vo_instance
         instance.__vo_id__ = instance_id
-        context.add_instance(instance)
+        context.add_instance(instance, xml_element)
 
         return instance
 
     def is_template(self, xml_element):
-        return len(xml_element.xpath(f'.//{get_local_name("COLUMN")}')) > 0
+        return has_descendant(xml_element, "COLUMN")
 
 
 class Element:
@@ -123,7 +319,7 @@ class Element:
     def __init__(self, xml_element, field_object, context, parser):
         self.field_object = field_object
         self.role_id = role_id = field_object.vodml_id
-        self.xml = find_element_for_role(xml_element, self.TAG_NAME, role_id)
+        self.xml = parser.votable.index.find_element_for_role(xml_element, self.TAG_NAME, role_id)
         self.context = context
         self.parser = parser
 
@@ -166,16 +362,14 @@ class ReferenceElement(Element):
         if referred_instance is not None:
             return referred_instance
 
-        referred_elements = xml_element.xpath(f"//{get_local_name('INSTANCE')}[@ID='{ref}']")
+        referred_element = self.parser.votable.index.find_instance_by_id(ref)
 
-        if not referred_elements:
-            # TODO make a single call?
+        if referred_element is None:
             msg = f"Dangling reference {ref}"
             warnings.warn(msg, SyntaxWarning)
             LOG.warning(msg)
             return None
 
-        referred_element = referred_elements[0]
         return self.parser.read_instance(referred_element, self.context)
 
 
@@ -231,57 +425,56 @@ class AttributeElement(ElementWithInstances):
         return None
 
     def _parse_literal(self, xml_element):
-        value = xml_element.xpath("@value")[0]
-        value_type = xml_element.xpath("@dmtype")[0]
-        units = xml_element.xpath("@unit")
-        unit = units[0] if units else None
-        return self.context.get_type_by_id(value_type)(value, unit)
+        with phase_timer(self.context.stats, 'literal'):
+            return make_literal(xml_element, self.context)
 
     def _parse_column(self, xml_element):
-        column_ref = xml_element.xpath("@ref")[0]
-        find_column_xpath = f"//{get_local_name('FIELD')}[@ID='{column_ref}']"
-        column_elements = xml_element.xpath(find_column_xpath)
-        if not column_elements:
+        column_ref = xml_element.get("ref")
+        field = self.parser.votable.index.find_field(column_ref)
+        if field is None:
             msg = f"Can't find column with ID {column_ref}. Setting values to NaN"
             LOG.warning(msg)
             warnings.warn(msg, SyntaxWarning)
             return numpy.NaN
 
-        column_element = column_elements[0]
-        table = self._parse_table(column_element)
+        column_element, table_element, table_index = field
+        table = self._parse_table(table_element, table_index)
 
         column = table[column_ref]
 
-        name = column_element.xpath("@name")[0]
+        name = column_element.get("name")
         column.name = name
 
         return column
 
-    def _parse_table(self, column_element):
-
-        table_elements = column_element.xpath(f"parent::{get_local_name('TABLE')}")
-        if not table_elements:
+    def _parse_table(self, table_element, table_index):
+        if table_element is None:
             raise RuntimeError("COLUMN points to FIELD that does not have a TABLE parent")
-        table_element = table_elements[0]
-        table_index = int(table_element.xpath(f"count(preceding-sibling::{get_local_name('TABLE')})"))
-
-        table_ids = table_element.xpath('@ID')
-        if table_ids:
-            no_id = False
-            table_id = table_ids[0]
-            table = self.context.get_table_by_id(table_id)
-            if table is not None:
-                return table
-        else:
-            no_id = True
-            table_id = f"_GENERATED_ID_{table_index}"
-
-        table = QTable(votable.parse_single_table(self.context.file, table_number=table_index).to_table())
 
-        if no_id:
-            table_id = id(table)
-            table_element.attrib["ID"] = str(table_id)  # We set the attribute so we have an handle if we parse it again
+        table_id = table_element.get('ID', f"_GENERATED_ID_{table_index}")
+        table = self.context.get_table_by_id(table_id)
+        if table is not None:
+            return table
 
+        table = self.parser.votable.decode_table(table_index)
         self.context.add_table(table_id, table)
 
         return table
+
+
+def make_literal(xml_element, context):
+    value = xml_element.get("value")
+    value_type = xml_element.get("dmtype")
+    unit = xml_element.get("unit")
+    return context.literals.convert(value_type, value, unit)
+
+
+def _to_table(votable_table):
+    # Same as astropy's to_table(), but the columns are views on the decoded array rather than copies.
+    meta = {key: getattr(votable_table, key) for key in ("ID", "name", "ref", "ucd", "utype", "description")
+            if getattr(votable_table, key, None) is not None}
+    names = [field.ID for field in votable_table.fields]
+    table = Table(votable_table.array, names=names, meta=meta, copy=False)
+    for name, field in zip(names, votable_table.fields):
+        field.to_table_column(table[name])
+    return table
@@ -19,6 +19,9 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import subprocess
+import sys
+
 import pytest
 from astropy.coordinates import SkyCoord
 from astropy.table import MaskedColumn
@@ -28,8 +31,11 @@ from numpy.testing import assert_array_equal
 from rama.models.dataset import ObsDataset
 
 from rama.models.coordinates import GenericCoordValue
+from rama.models.coordinates import TimeStamp
 from rama.models.cube import NDPoint
+from rama.models.measurements import CoordMeasure, GenericCoordMeasure, SkyPosition, StdTimeMeasure
 from rama.reader import Reader
+from rama.reader.query import Range
 from rama.reader.votable import Votable
 
 
@@ -57,6 +63,42 @@ def test_ndpoint(context_cube, recwarn):
         assert "W10" in str(recwarn[i].message)
 
 
+def test_parsing_does_not_import_matplotlib(make_data_path):
+    script = f'''
+import sys
+import rama
+from rama.models.cube import NDPoint
+from rama.tools.time import TimeSeries
+TimeSeries(rama.read({make_data_path("cube.vot.xml")!r}).find_instances(NDPoint)[0])
+assert 'matplotlib' not in sys.modules, 'matplotlib was imported'
+'''
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+
+def test_find_subclasses(context_cube, recwarn):
+    measures = context_cube.find_instances(CoordMeasure, include_subclasses=True)
+
+    assert not context_cube.find_instances(CoordMeasure)
+    assert [type(measure) for measure in measures] == [StdTimeMeasure, SkyPosition, GenericCoordMeasure,
+                                                       GenericCoordMeasure]
+    assert measures[1] is context_cube.find_instances(SkyPosition)[0]
+
+
+def test_find_instances_many(context_cube, recwarn):
+    found = context_cube.find_instances_many([SkyPosition, TimeStamp], include_subclasses=True)
+
+    assert list(found) == [SkyPosition, TimeStamp]
+    assert len(found[SkyPosition]) == 1
+    assert isinstance(found[TimeStamp][0], Time)
+
+
+def test_dataset_where(context_cube, recwarn):
+    assert context_cube.find_instances(ObsDataset, where={'data_product_type': 'TIMESERIES',
+                                                          'calib_level': Range(min=2, max=3)})
+    assert not context_cube.find_instances(ObsDataset, where={'calib_level': Range(max=2)})
+    assert not context_cube.find_instances(ObsDataset, where={'data_product_type': 'SPECTRUM'})
+
+
 def test_dataset(context_cube, recwarn):
     datasets = context_cube.find_instances(ObsDataset)
     dataset = datasets[0]
@@ -0,0 +1,81 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+from lxml import etree
+
+from rama.reader.votable.index import AnnotationIndex
+
+
+@pytest.fixture
+def index(make_data_path):
+    return AnnotationIndex(etree.parse(make_data_path("test5.vot.xml")).getroot())
+
+
+def test_instances_by_type(index):
+    filters = index.find_instances_by_type("filter:PhotometryFilter")
+
+    assert len(filters) == 5
+    assert [element.get("ID") for element in filters[:3]] == ["_2massH", "_2massJ", "_2massK"]
+    assert index.find_instances_by_type("foo:bar") == []
+
+
+def test_instance_by_id(index):
+    assert index.find_instance_by_id("_icrs").get("dmtype") == "sample:catalog.SkyCoordinateFrame"
+    assert index.find_instance_by_id("foo") is None
+
+
+def test_fields(index):
+    field, table, position = index.find_field("_rMag")
+
+    assert field.get("name") == "rmag"
+    assert table.get("ID") == "_sdss_mags"
+    assert position == 1
+    assert index.tables[position] is table
+    assert index.find_field("foo") is None
+
+
+def test_nested_resource_tables():
+    root = etree.fromstring('''<VOTABLE>
+      <RESOURCE>
+        <RESOURCE><TABLE ID="A"><FIELD ID="a"/></TABLE></RESOURCE>
+        <TABLE ID="B"><FIELD ID="b"/></TABLE>
+      </RESOURCE>
+      <RESOURCE><TABLE ID="C"><FIELD ID="c"/></TABLE></RESOURCE>
+    </VOTABLE>''')
+    index = AnnotationIndex(root)
+
+    assert [table.get("ID") for table in index.tables] == ["B", "A", "C"]
+    assert [index.find_field(field_id)[2] for field_id in "abc"] == [1, 0, 2]
+
+
+def test_roles_are_direct_children():
+    root = etree.fromstring('''<INSTANCE dmtype="foo:Outer">
+      <ATTRIBUTE dmrole="foo:Outer.inner">
+        <INSTANCE dmtype="foo:Inner"><ATTRIBUTE dmrole="foo:name"><LITERAL value="inner"/></ATTRIBUTE></INSTANCE>
+      </ATTRIBUTE>
+    </INSTANCE>''')
+    index = AnnotationIndex(root)
+    inner = index.find_instances_by_type("foo:Inner")[0]
+
+    assert index.find_element_for_role(root, "ATTRIBUTE", "foo:name") is None
+    assert index.find_element_for_role(inner, "ATTRIBUTE", "foo:name") is inner[0]
+    assert index.find_element_for_role(root, "REFERENCE", "foo:Outer.inner") is None
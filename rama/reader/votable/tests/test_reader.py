@@ -19,17 +19,32 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import gzip
+import io
+import mmap
+import pathlib
+import pickle
+from unittest import mock
+
 import numpy
 import pytest
 from astropy import units as u
 from astropy.coordinates import SkyCoord, FK5
+from astropy.io import votable
 from astropy.tests.helper import assert_quantity_allclose
 from astropy.time import Time
 from astropy.units import Quantity
 
-from rama.models.coordinates import SpaceFrame
-from rama.models.measurements import SkyPosition
-from rama import read
+from rama.adapters import LazyAdapter, resolve
+from rama.adapters.astropy import SkyCoordAdapter
+from rama.models.coordinates import (CartesianCoord, EclipticCoord, EquatorialCoord, GalacticCoord, LongLatCoord,
+                                     SpaceFrame, UnitSphereCoord)
+from rama.models.ivoa import parse_unit
+from rama.models.measurements import Error2D, SkyPosition
+from rama import read, ReaderStats
+from rama.reader.cache import ParseCache
+from rama.reader.query import Range
+from rama.reader.source import BufferReader
 
 
 @pytest.fixture
@@ -71,6 +86,49 @@ def test_parsing_coordinates(simple_position_file):
     # assert "TOPOCENTER" == pos.coord.frame.ref_position.position
 
 
+def test_buffer_reader_past_end():
+    reader = BufferReader(b'abc')
+    assert reader.seek(10) == 10
+    assert reader.read() == b''
+    assert reader.readinto(bytearray(4)) == 0
+
+    reader.seek(1)
+    assert reader.read() == b'bc'
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_close(make_data_path, streaming):
+    with read(make_data_path('simple-position-columns.vot.xml'), streaming=streaming) as reader:
+        position = reader.find_instances(SkyPosition)[0]
+    assert reader.document.source.buffer.closed
+    assert len(position.coord.ra) == 2
+
+
+def test_lazy_adapters(make_data_path):
+    reader = read(make_data_path('simple-position.vot.xml'), lazy_adapters=True, stats=True)
+    coord = reader.find_instances(SkyPosition)[0].coord
+
+    assert type(coord) is LazyAdapter
+    assert coord.__vo_object__.frame.space_ref_frame == 'FK5'
+    assert reader.stats.calls['adapter'] == 0
+
+    assert isinstance(coord, SkyCoord)
+    assert coord.ra == 10.34209135 * u.Unit('deg')
+    assert isinstance(resolve(coord).frame, FK5)
+    assert resolve(coord).__vo_object__ is coord.__vo_object__
+    assert reader.stats.calls['adapter'] == 1
+
+    assert isinstance(pickle.loads(pickle.dumps(coord)), SkyCoord)
+
+
+def test_raw(make_data_path):
+    coord = read(make_data_path('simple-position.vot.xml'), raw=True).find_instances(SkyPosition)[0].coord
+
+    assert type(coord) is EquatorialCoord
+    assert coord.ra == 10.34209135 * u.Unit('deg')
+    assert coord.frame.equinox == 'J1975'
+
+
 def test_references_are_same_object(references_file):
     sky_positions = references_file.find_instances(SkyPosition)
 
@@ -103,6 +161,282 @@ def test_parsing_columns(simple_position_columns_file, recwarn):
         assert "W10" in str(recwarn[i].message)
 
 
+def test_streaming_drops_table_rows(make_data_path, recwarn):
+    streamed = read(make_data_path('simple-position-columns.vot.xml'), streaming=True)
+
+    assert not streamed.document.document.xpath("//*[local-name() = 'TD']")
+    assert streamed.document.document.xpath("//*[local-name() = 'FIELD']")
+
+    position = streamed.find_instances(SkyPosition)[0]
+    expected_ra = numpy.array([10.0, 20.0], dtype='float32') * u.Unit('deg')
+    numpy.testing.assert_array_equal(expected_ra, position.coord.ra)
+    assert position.coord.equinox == Time("J1975")
+
+
+def test_tables_decoded_once(simple_position_columns_file, recwarn):
+    with mock.patch('rama.reader.votable.parser.votable') as astropy_votable:
+        astropy_votable.parse.side_effect = votable.parse
+        simple_position_columns_file.find_instances(SkyPosition)
+        simple_position_columns_file.find_instances(SkyPosition)
+
+    assert astropy_votable.parse.call_count == 1
+    assert not astropy_votable.parse_single_table.called
+    assert simple_position_columns_file.get_table_by_id('_table1') is not None
+
+
+@pytest.mark.parametrize('as_file', [lambda path: open(path, 'rb').read(),
+                                     lambda path: io.BytesIO(open(path, 'rb').read()),
+                                     lambda path: io.StringIO(open(path, encoding='utf-8').read())])
+def test_in_memory_sources(make_data_path, as_file, recwarn):
+    in_memory = read(as_file(make_data_path('simple-position-columns.vot.xml')))
+    position = in_memory.find_instances(SkyPosition)[0]
+
+    expected_dec = numpy.array([11.0, 21.0], dtype='float32') * u.Unit('deg')
+    numpy.testing.assert_array_equal(expected_dec, position.coord.dec)
+
+
+def test_nested_resource_columns(make_data_path, recwarn):
+    with open(make_data_path('simple-position-columns.vot.xml'), 'rb') as file:
+        content = file.read()
+    nested = (b'<RESOURCE><TABLE ID="_nested"><FIELD name="x" ID="_X" datatype="float"/>'
+              b'<DATA><TABLEDATA><TR><TD>1.0</TD></TR></TABLEDATA></DATA></TABLE></RESOURCE>')
+    content = content.replace(b'<RESOURCE ID="table_objects">', b'<RESOURCE ID="table_objects">' + nested, 1)
+
+    position = read(content).find_instances(SkyPosition)[0]
+
+    expected_dec = numpy.array([11.0, 21.0], dtype='float32') * u.Unit('deg')
+    numpy.testing.assert_array_equal(expected_dec, position.coord.dec)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_gzip_source(make_data_path, tmpdir, streaming, recwarn):
+    path = make_data_path('simple-position-columns.vot.xml')
+    compressed = tmpdir.join('simple-position-columns.vot.xml.gz')
+    with open(path, 'rb') as file:
+        compressed.write_binary(gzip.compress(file.read()))
+
+    with read(str(compressed), streaming=streaming) as reader:
+        assert isinstance(reader.document.source.buffer, mmap.mmap)
+        position = reader.find_instances(SkyPosition)[0]
+
+    expected_dec = numpy.array([11.0, 21.0], dtype='float32') * u.Unit('deg')
+    numpy.testing.assert_array_equal(expected_dec, position.coord.dec)
+    assert reader.document.source.buffer.closed
+
+
+def test_url_source(make_data_path, recwarn):
+    url = pathlib.Path(make_data_path('simple-position-columns.vot.xml')).resolve().as_uri()
+    reader = read(url)
+    position = reader.find_instances(SkyPosition)[0]
+
+    assert reader.document.source.path is None
+    assert len(position.coord.ra) == 2
+
+
+def test_declared_encoding(make_data_path, recwarn):
+    with open(make_data_path('simple-position-columns.vot.xml'), encoding='utf-8') as file:
+        content = file.read()
+    content = content.replace('encoding="utf-8"', 'encoding="ISO-8859-1"', 1)
+    content = content.replace('<VODML>', '<VODML><!-- Ångström -->', 1)
+
+    reader = read(io.StringIO(content))
+
+    assert reader.document.source.buffer.count('Å'.encode('latin-1')) == 1
+    assert 'Ångström' in reader.document.document.xpath('//comment()')[0].text
+    assert len(reader.find_instances(SkyPosition)[0].coord.ra) == 2
+
+
+def test_cached_reads(make_data_path, tmpdir, recwarn):
+    path = make_data_path('simple-position-columns.vot.xml')
+    cold = read(path, cache_dir=str(tmpdir)).find_instances(SkyPosition)[0]
+
+    with mock.patch('rama.reader.votable.parser.votable') as astropy_votable:
+        warm_file = read(path, cache_dir=str(tmpdir))
+        warm = warm_file.find_instances(SkyPosition)[0]
+
+    assert not astropy_votable.parse.called
+    assert not astropy_votable.parse_single_table.called
+    assert not warm_file.document.document.xpath("//*[local-name() = 'TD']")
+    numpy.testing.assert_array_equal(cold.coord.ra, warm.coord.ra)
+    numpy.testing.assert_array_equal(cold.coord.dec, warm.coord.dec)
+    assert warm.coord.equinox == Time("J1975")
+
+
+def test_cache_eviction(make_data_path, tmpdir, recwarn):
+    read(make_data_path('simple-position-columns.vot.xml'), cache_dir=str(tmpdir))
+    oldest, = [entry for entry in tmpdir.listdir() if entry.basename.startswith('v')]
+    oldest.setmtime(0)
+    read(make_data_path('simple-position.vot.xml'), cache_dir=str(tmpdir))
+    newest, = [entry for entry in tmpdir.listdir() if entry.basename.startswith('v') and entry != oldest]
+
+    newest_size = sum(file.size() for file in newest.listdir())
+    ParseCache(str(tmpdir), max_size=newest_size).evict()
+
+    assert not oldest.exists()
+    assert newest.exists()
+
+
+def test_cache_entry_evicted_while_loading(make_data_path, tmpdir, recwarn):
+    path = make_data_path('simple-position-columns.vot.xml')
+    read(path, cache_dir=str(tmpdir))
+
+    with mock.patch('rama.reader.cache.os.utime', side_effect=FileNotFoundError):
+        position = read(path, cache_dir=str(tmpdir)).find_instances(SkyPosition)[0]
+
+    assert len(position.coord.ra) == 2
+
+
+def test_stats(make_data_path, recwarn):
+    published = []
+    reader = read(make_data_path('simple-position-columns.vot.xml'), stats=ReaderStats(callback=published.append))
+    reader.find_instances(SkyPosition)
+    reader.find_instances(SkyPosition)
+
+    stats = reader.stats.as_dict()
+    assert published[-1] == stats
+    assert len(published) == 2
+
+    phases = stats['phases']
+    assert {'parse', 'index', 'find', 'lookup', 'decode', 'literal', 'adapter'} == set(phases)
+    assert phases['parse']['calls'] == 1
+    assert phases['find']['calls'] == 2
+    assert phases['decode']['calls'] == 1
+    assert phases['adapter']['calls'] == 1
+    assert phases['find']['time'] >= phases['decode']['time'] > 0
+
+    assert stats['instances']['meas:SkyPosition'] == 1
+    assert stats['instances']['coords:domain.space.SpaceFrame'] == 1
+    assert stats['caches']['found'] == {'hits': 1, 'misses': 1}
+    assert stats['caches']['tables'] == {'hits': 1, 'misses': 1}
+    assert stats['caches']['instances'] == {'hits': 0, 'misses': 2}
+
+
+def test_found_instances_memoized(simple_position_file):
+    positions = simple_position_file.find_instances(SkyPosition)
+
+    with mock.patch.object(simple_position_file.document, 'find_instances_many') as find_instances_many:
+        assert simple_position_file.find_instances(SkyPosition) == positions
+    assert not find_instances_many.called
+
+    simple_position_file.invalidate(SkyPosition)
+    assert simple_position_file.find_instances(SkyPosition)[0] is positions[0]
+
+    simple_position_file.invalidate()
+    assert simple_position_file.find_instances(SkyPosition)[0] is not positions[0]
+
+
+def test_anonymous_instances_cached_by_element(references_file):
+    positions = references_file.find_instances(SkyPosition)
+    coords = references_file.find_instances(EquatorialCoord)
+
+    assert {id(position.coord) for position in positions} == {id(coord) for coord in coords}
+
+
+def test_where(make_data_path, recwarn):
+    reader = read(make_data_path('references.vot.xml'), stats=True)
+
+    assert not reader.find_instances(SkyPosition, where={'coord.frame.space_ref_frame': 'ICRS'})
+    assert not reader.stats.instances
+
+    frames = reader.find_instances(SpaceFrame, where={'space_ref_frame': 'FK5', 'equinox': None})
+    positions = reader.find_instances(SkyPosition, where={'coord.frame.space_ref_frame': 'FK5'})
+    assert len(positions) == 2
+    assert positions[0].coord.frame is frames[0]
+
+
+def test_where_range_on_missing_attribute(references_file, recwarn):
+    assert not references_file.find_instances(SpaceFrame, where={'equinox': Range(min='J1900')})
+    assert not references_file.find_instances(SpaceFrame, where={'equinox': Range(max='J2100')})
+    assert not references_file.find_instances(SkyPosition, where={'coord.frame.equinox': Range(min='J1900')})
+
+
+def test_where_on_columns(simple_position_columns_file, recwarn):
+    def all_above(value):
+        return lambda quantity: (quantity.value > value).all()
+
+    assert len(simple_position_columns_file.find_instances(SkyPosition, where={'coord.ra': all_above(5)})) == 1
+    assert not simple_position_columns_file.find_instances(SkyPosition, where={'coord.ra': all_above(15)})
+
+
+ERRORS_DOCUMENT = '''<VOTABLE><VODML><GLOBALS>{}</GLOBALS></VODML></VOTABLE>'''
+
+ERROR_INSTANCE = '''<INSTANCE dmtype="meas:Error2D">
+  <ATTRIBUTE dmrole="meas:Error2D.statError">
+    <INSTANCE dmtype="meas:Symmetrical2D">
+      <ATTRIBUTE dmrole="meas:Symmetrical2D.radius">
+        <LITERAL value="{}" dmtype="ivoa:RealQuantity" unit="arcsec"/>
+      </ATTRIBUTE>
+    </INSTANCE>
+  </ATTRIBUTE>
+</INSTANCE>'''
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_find_instances_iter(streaming):
+    document = ERRORS_DOCUMENT.format(''.join(ERROR_INSTANCE.format(i) for i in range(10))).encode('utf-8')
+    reader = read(document, streaming=streaming, stats=True)
+
+    errors = reader.find_instances_iter(Error2D)
+    first = next(errors)
+    assert first.stat_error.radius == 0 * u.arcsec
+    assert reader.stats.instances['meas:Error2D'] == 1
+
+    radii = [error.stat_error.radius.value for error in errors]
+    assert radii == list(range(1, 10))
+    assert not reader.element_instances
+    assert not reader.found_instances
+    assert not reader.document.index._roles
+    assert len(reader.find_instances(Error2D)) == 10
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_find_instances_iter_interleaved(streaming):
+    document = ERRORS_DOCUMENT.format(''.join(ERROR_INSTANCE.format(i) for i in range(5))).encode('utf-8')
+    reader = read(document, streaming=streaming)
+
+    first = reader.find_instances_iter(Error2D)
+    second = reader.find_instances_iter(Error2D)
+    radii = [(a.stat_error.radius.value, b.stat_error.radius.value) for a, b in zip(first, second)]
+    assert radii == [(i, i) for i in range(5)]
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_find_instances_after_partial_scan(streaming):
+    document = ERRORS_DOCUMENT.format(''.join(ERROR_INSTANCE.format(i) for i in range(5))).encode('utf-8')
+    reader = read(document, streaming=streaming)
+
+    errors = reader.find_instances_iter(Error2D)
+    next(errors)
+    assert [error.stat_error.radius.value for error in reader.find_instances(Error2D)] == list(range(5))
+    assert [error.stat_error.radius.value for error in errors] == list(range(1, 5))
+
+
+@pytest.mark.parametrize('intern_literals', [False, True])
+def test_intern_literals(intern_literals):
+    document = ERRORS_DOCUMENT.format(''.join(ERROR_INSTANCE.format(i % 2) for i in range(4))).encode('utf-8')
+    reader = read(document, stats=True, intern_literals=intern_literals)
+
+    radii = [error.stat_error.radius for error in reader.find_instances(Error2D)]
+    assert [radius.to_value(u.arcsec) for radius in radii] == [0, 1, 0, 1]
+    assert (radii[0] is radii[2]) == intern_literals
+    assert radii[0].unit is parse_unit('arcsec')
+
+    if intern_literals:
+        assert reader.stats.as_dict()['caches']['literals'] == {'hits': 2, 'misses': 2}
+        with pytest.raises(ValueError):
+            radii[0] += 1 * u.arcsec
+
+
+def test_find_instances_iter_keeps_document(make_data_path, recwarn):
+    reader = read(make_data_path('references.vot.xml'), streaming=True)
+
+    positions = list(reader.find_instances_iter(SkyPosition))
+    assert len(positions) == 2
+    assert positions[0].coord.frame is positions[1].coord.frame
+    assert reader.find_instances(SpaceFrame)
+    assert len(reader.find_instances(EquatorialCoord)) == 2
+
+
 def test_attribute_multiplicity(asymmetric_data_file, recwarn):
     position = asymmetric_data_file.find_instances(SkyPosition)[0]
 
@@ -130,3 +464,49 @@ def test_invalid_file(invalid_file):
     numpy.testing.assert_array_equal(expected_ra, position.coord.ra)
     # The unit is bogus, so we can't really test for equality
     numpy.testing.assert_array_equal(expected_dec.value, position.coord.dec.value)
+
+
+def _make_coord(coord_class, frame=None, **components):
+    coord = coord_class()
+    coord.frame = frame
+    for name, value in components.items():
+        setattr(coord, name, value)
+    return coord
+
+
+@pytest.mark.parametrize('coord_class, components, expected', [
+    (GalacticCoord, {'l': [10, 20] * u.deg, 'b': [1, 2] * u.deg},
+     SkyCoord(l=[10, 20] * u.deg, b=[1, 2] * u.deg, frame='galactic')),
+    (EclipticCoord, {'elong': 10 * u.deg, 'elat': 1 * u.deg, 'r': 2 * u.kpc},
+     SkyCoord(lon=10 * u.deg, lat=1 * u.deg, distance=2 * u.kpc, frame='geocentricmeanecliptic')),
+    (LongLatCoord, {'long': 10 * u.deg, 'lat': 1 * u.deg}, SkyCoord(ra=10 * u.deg, dec=1 * u.deg)),
+    (CartesianCoord, {'x': 1 * u.pc, 'y': 0 * u.pc, 'z': 0 * u.pc},
+     SkyCoord(ra=0 * u.deg, dec=0 * u.deg, distance=1 * u.pc)),
+    (UnitSphereCoord, {'dircosx': 0., 'dircosy': 1., 'dircosz': 0.}, SkyCoord(ra=90 * u.deg, dec=0 * u.deg)),
+])
+def test_sky_coord_subtypes(coord_class, components, expected):
+    sky_coord = SkyCoordAdapter(_make_coord(coord_class, **components))
+
+    assert isinstance(sky_coord, SkyCoord)
+    assert sky_coord.frame.name == expected.frame.name
+    assert_quantity_allclose(sky_coord.separation(expected), 0 * u.deg, atol=1e-9 * u.deg)
+
+
+def test_sky_coord_frame_cache():
+    frame = SpaceFrame()
+    frame.space_ref_frame = 'FK5'
+    frame.equinox = 'J1975'
+
+    first = SkyCoordAdapter(_make_coord(EquatorialCoord, frame, ra=[1, 2] * u.deg, dec=[3, 4] * u.deg))
+    second = SkyCoordAdapter(_make_coord(EquatorialCoord, frame, ra=5 * u.deg, dec=6 * u.deg))
+
+    assert isinstance(first.frame, FK5)
+    assert first.equinox == second.equinox == Time('J1975')
+    with mock.patch('rama.adapters.astropy._make_frame') as make_frame:
+        SkyCoordAdapter(_make_coord(EquatorialCoord, frame, ra=5 * u.deg, dec=6 * u.deg))
+    assert not make_frame.called
+
+
+def test_sky_coord_missing_components(recwarn):
+    coord = _make_coord(GalacticCoord, l=10 * u.deg)
+    assert SkyCoordAdapter(coord) is coord
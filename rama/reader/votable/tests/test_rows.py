@@ -0,0 +1,99 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import numpy
+import pytest
+from astropy import units as u
+from astropy.tests.helper import assert_quantity_allclose
+
+from rama import read
+from rama.models.coordinates import EquatorialCoord, SpaceFrame
+from rama.models.measurements import SkyPosition
+from rama.models.test.filter import PhotometryFilter
+from rama.models.test.sample import Source, SkyCoordinateFrame
+
+
+@pytest.fixture
+def test5_file(make_data_path):
+    return read(make_data_path("test5.vot.xml"))
+
+
+@pytest.fixture
+def simple_position_columns_file(make_data_path):
+    return read(make_data_path('simple-position-columns.vot.xml'))
+
+
+def test_template_rows(test5_file, recwarn):
+    rows = test5_file.find_templates(Source)[0]
+    frame = test5_file.find_instances(SkyCoordinateFrame)[0]
+
+    assert len(rows) == 3
+    source = rows[1]
+    assert isinstance(source, Source)
+    assert not source.is_template
+    assert_quantity_allclose(source.position.longitude, 122.986794 * u.Unit('deg'))
+    assert source.position.frame is frame
+    assert [luminosity.type for luminosity in source.luminosity] == ['magnitude'] * 3
+    assert_quantity_allclose(source.luminosity[0].value, 15.103 * u.Unit('mag'))
+    assert source.luminosity[0].filter is test5_file.find_instances(PhotometryFilter)[0]
+    assert rows[-1].position.latitude == rows[2].position.latitude
+    assert [row.position.latitude for row in rows[:2]] == [rows[0].position.latitude, rows[1].position.latitude]
+
+    with pytest.raises(IndexError):
+        rows[3]
+
+
+def test_iter_rows(simple_position_columns_file, recwarn):
+    positions = list(simple_position_columns_file.iter_rows(SkyPosition))
+    frame = simple_position_columns_file.find_instances(SpaceFrame)[0]
+
+    assert len(positions) == 2
+    assert isinstance(positions[0].coord, EquatorialCoord)
+    assert positions[0].coord.ra == 10 * u.Unit('deg')
+    assert positions[1].coord.dec == 21 * u.Unit('deg')
+    assert positions[1].coord.frame is frame
+
+
+def test_iter_rows_direct_instances(simple_position_columns_file, recwarn):
+    frames = list(simple_position_columns_file.iter_rows(SpaceFrame))
+
+    assert frames == simple_position_columns_file.find_instances(SpaceFrame)
+    assert simple_position_columns_file.find_templates(SpaceFrame) == []
+
+
+def test_to_columns(test5_file, recwarn):
+    source = test5_file.find_instances(Source)[0]
+    columns = test5_file.to_columns(Source)
+
+    assert 'position.frame' not in columns.colnames
+    assert 'luminosity[0].type' not in columns.colnames
+    assert len(columns) == 3
+    assert numpy.shares_memory(columns['position.longitude'], source.position.longitude)
+    assert numpy.shares_memory(columns['luminosity[2].error'], source.luminosity[2].error)
+    assert columns['luminosity[1].value'].unit == u.Unit('mag')
+    assert columns['name'][0] == source.name[0]
+
+
+def test_to_columns_adapted(simple_position_columns_file, recwarn):
+    columns = simple_position_columns_file.to_columns(SkyPosition)
+
+    assert columns.colnames == ['coord.dec', 'coord.ra']
+    assert columns['coord.ra'][1] == 20 * u.Unit('deg')
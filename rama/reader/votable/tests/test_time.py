@@ -19,12 +19,17 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import numpy
 import pytest
 from astropy import units as u
+from astropy.table import MaskedColumn
 from astropy.time import Time
 from numpy.testing import assert_array_equal
 
 from rama import read
+from rama.adapters import LazyAdapter, resolve
+from rama.adapters.astropy import TimeAdapter
+from rama.models.coordinates import MJD, TimeFrame
 from rama.models.measurements import StdTimeMeasure
 
 
@@ -42,9 +47,51 @@ def test_time(time_file, recwarn):
     assert isinstance(time.coord, Time)
     expected_time = Time([2453486.5, 0.0] * u.Unit('d'), format='jd', scale='tt')
 
-    assert_array_equal(time.coord, expected_time)
+    assert_array_equal(time.coord.mask, [False, True])
+    assert time.coord[0] == expected_time[0]
+    assert time.coord.name == 'h_time'
 
     assert "W20" in str(recwarn[0].message)
     assert "W41" in str(recwarn[1].message)
     for i in range(2, 12):
         assert "W10" in str(recwarn[i].message)
+
+
+def test_lazy_time(make_data_path):
+    time = read(make_data_path('time.vot.xml'), lazy_adapters=True).find_instances(StdTimeMeasure)[0].coord
+    start = Time(2453486.0, format='jd', scale='tt')
+
+    assert type(time) is LazyAdapter
+    assert numpy.asarray(time).shape == (2,)
+    assert numpy.asarray(time)[0] == resolve(time)[0]
+    assert (time - start)[0].jd == 0.5
+    assert (start - time)[0].jd == -0.5
+    assert (time > start)[0]
+    assert not (time <= start)[0]
+
+    assert f'{time}' == str(resolve(time))
+
+    time[0] = start
+    assert resolve(time)[0] == start
+    assert type(time) is LazyAdapter
+
+
+def test_time_adapter_masks_missing_values():
+    values = numpy.ma.array(numpy.arange(100000, dtype=float) + 58000, mask=False)
+    values[1] = numpy.ma.masked
+    values.data[2] = numpy.nan
+
+    frame = TimeFrame()
+    frame.timescale = 'TDB'
+    stc_time = MJD()
+    stc_time.frame = frame
+    stc_time.date = MaskedColumn(values, name='mjd', unit='d')
+
+    time = TimeAdapter(stc_time)
+
+    assert time.format == 'mjd'
+    assert time.scale == 'tdb'
+    assert time.name == 'mjd'
+    assert time.mask[:4].tolist() == [False, True, True, False]
+    assert time.mask.sum() == 2
+    assert_array_equal(time[3:].mjd, values.data[3:])
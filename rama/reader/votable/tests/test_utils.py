@@ -0,0 +1,62 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+from lxml import etree
+
+from rama.reader.votable.utils import get_children, get_roles, has_descendant, resolve_id, resolve_type
+
+DOCUMENT = '''<INSTANCE {namespace} dmtype="foo:Bar" ID="_bar">
+  <ATTRIBUTE dmrole="foo:Bar.baz">
+    <INSTANCE dmtype="foo:Baz"><ATTRIBUTE dmrole="foo:Baz.column"><COLUMN ref="_col"/></ATTRIBUTE></INSTANCE>
+  </ATTRIBUTE>
+  <ATTRIBUTE dmrole="foo:Bar.value"><LITERAL value="1" dmtype="ivoa:integer"/></ATTRIBUTE>
+</INSTANCE>'''
+
+
+@pytest.fixture(params=['', 'xmlns="http://www.ivoa.net/xml/VOTable/v1.4"'])
+def instance(request):
+    return etree.fromstring(DOCUMENT.format(namespace=request.param))
+
+
+def test_helpers(instance):
+    assert resolve_id(instance) == "_bar"
+    assert resolve_type(instance) == "foo:Bar"
+    assert len(get_children(instance, "ATTRIBUTE")) == 2
+    assert get_children(instance, "LITERAL") == []
+    assert has_descendant(instance, "COLUMN")
+    assert not has_descendant(instance, "REFERENCE")
+
+
+def test_roles(instance):
+    roles = get_roles(instance)
+
+    assert set(roles) == {("ATTRIBUTE", "foo:Bar.baz"), ("ATTRIBUTE", "foo:Bar.value")}
+    assert get_children(roles["ATTRIBUTE", "foo:Bar.value"], "LITERAL")[0].get("value") == "1"
+
+
+def test_roles_duplicate():
+    instance = etree.fromstring('<INSTANCE><ATTRIBUTE dmrole="foo:a"/><ATTRIBUTE dmrole="foo:a"/></INSTANCE>')
+
+    with pytest.warns(SyntaxWarning, match="foo:a"):
+        roles = get_roles(instance)
+
+    assert roles["ATTRIBUTE", "foo:a"] is instance[0]
@@ -19,52 +19,54 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-import warnings
-
+"""
+Helpers for navigating VO-DML annotated VOTable documents.
 
-def resolve_id(xml_element):
-    ids = xml_element.xpath('@ID')
-    if ids:
-        return ids[0]
-    return None
+Elements are matched with lxml tag selectors rather than XPath expressions, so lookups use lxml's tag index and no
+expression has to be compiled on each call. Selectors match a tag name in any namespace, or no namespace at all, so
+the same helpers work with every version of the VOTable schema.
+"""
+import warnings
 
 
-def get_type_xpath_expression(tag_name, type_id):
-    tag_selector = get_local_name(tag_name)
-    return f"//{tag_selector}[@dmtype='{type_id}']"
+def get_tag(tag_name):
+    return f"{{*}}{tag_name}"
 
 
-def get_role_xpath_expression(tag_name, role_id):
-    tag_selector = get_local_name(tag_name)
-    return f".//{tag_selector}[@dmrole='{role_id}']"
+ROLE_TAGS = tuple(get_tag(tag_name) for tag_name in ('ATTRIBUTE', 'COMPOSITION', 'REFERENCE'))
 
 
-def get_local_name(tag_name):
-    return f"*[local-name() = '{tag_name}']"
+def resolve_id(xml_element):
+    return xml_element.get('ID')
 
 
-def get_child_selector(tag_name):
-    tag_selector = get_local_name(tag_name)
-    return f"child::{tag_selector}"
+def resolve_type(xml_element):
+    return xml_element.get('dmtype')
 
 
 def get_children(element, child_tag_name):
-    return element.xpath(get_child_selector(child_tag_name))
+    return list(element.iterchildren(get_tag(child_tag_name)))
 
 
-def resolve_type(xml_element):
-    element_type = xml_element.xpath("@dmtype")[0]
-    return element_type
-
+def has_descendant(element, tag_name):
+    return next(element.iterdescendants(get_tag(tag_name)), None) is not None
 
-def find_element_for_role(xml_element, tag_name, role_id):
-    elements = xml_element.xpath(get_role_xpath_expression(tag_name, role_id))
-    n_elements = len(elements)
 
-    if n_elements > 1:
-        warnings.warn(SyntaxWarning, f"Too many elements with dmrole = {role_id}")
+def get_local_name(xml_element):
+    return xml_element.tag.rpartition('}')[2]
 
-    if n_elements:
-        return elements[0]
 
-    return None
+def get_roles(xml_element):
+    """
+    Map the ``(tag name, dmrole)`` pairs of the ATTRIBUTE, COMPOSITION and REFERENCE children of an element to the
+    child elements. Only direct children are considered, so roles of nested instances are never picked up.
+    """
+    roles = {}
+    for element in xml_element.iterchildren(*ROLE_TAGS):
+        key = (get_local_name(element), element.get('dmrole'))
+        if key in roles:
+            msg = f"Too many elements with dmrole = {key[1]}"
+            warnings.warn(msg, SyntaxWarning)
+            continue
+        roles[key] = element
+    return roles
@@ -0,0 +1,77 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+
+import pytest
+
+from rama import read_many
+from rama.batch import WorkerError
+from rama.models.coordinates import SpaceFrame
+from rama.models.measurements import SkyPosition
+
+
+@pytest.fixture
+def references_path():
+    return os.path.join(os.path.dirname(__file__), '..', 'reader', 'votable', 'tests', 'data', 'references.vot.xml')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_read_many(references_path, workers):
+    paths = [references_path, 'no-such-file.vot.xml', references_path]
+    results = list(read_many(paths, [SkyPosition, SpaceFrame], workers=workers))
+
+    assert [result.path for result in results] == paths
+    assert [result.ok for result in results] == [True, False, True]
+    assert all(result.elapsed >= 0 for result in results)
+
+    positions = results[0][SkyPosition]
+    assert len(positions) == 2
+    assert len(results[2][SpaceFrame]) == 1
+
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert "FileNotFoundError" in results[1].traceback
+    assert results[1].instances is None
+
+
+def test_read_many_as_completed(references_path):
+    paths = [references_path] * 3 + ['no-such-file.vot.xml']
+    results = list(read_many(paths, [SkyPosition], workers=2, ordered=False))
+
+    assert sorted(result.path for result in results) == sorted(paths)
+    assert sum(result.ok for result in results) == 3
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_read_many_malformed(tmpdir, workers):
+    malformed = tmpdir.join('malformed.vot.xml')
+    malformed.write('<VOTABLE><RESOURCE></VOTABLE>')
+
+    result, = read_many([str(malformed)], [SkyPosition], workers=workers)
+
+    assert not result.ok
+    assert result.elapsed >= 0
+    assert "XMLSyntaxError" in result.traceback
+    assert "XMLSyntaxError" in repr(result)
+    if workers > 1:
+        assert isinstance(result.error, WorkerError)
+        assert result.error.type_name == 'XMLSyntaxError'
+        assert result.error.traceback == result.traceback
@@ -0,0 +1,85 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from rama import read
+from rama.models.coordinates import SpaceFrame
+from rama.models.cube import NDPoint
+from rama.models.measurements import SkyPosition
+
+DATA_FILES = ['references.vot.xml', 'simple-position.vot.xml', 'simple-position-columns.vot.xml', 'cube.vot.xml',
+              'asymmetric-2d-position.vot.xml']
+
+
+@pytest.fixture
+def data_paths():
+    directory = os.path.join(os.path.dirname(__file__), '..', 'reader', 'votable', 'tests', 'data')
+    return [os.path.join(directory, filename) for filename in DATA_FILES]
+
+
+def summarize(path):
+    reader = read(path)
+    positions = reader.find_instances(SkyPosition)
+    return (len(positions), len(reader.find_instances(NDPoint)),
+            [str(getattr(position.coord, 'ra', None)) for position in positions])
+
+
+def test_concurrent_reads(data_paths, recwarn):
+    expected = [summarize(path) for path in data_paths]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(summarize, data_paths * 20))
+
+    assert results == expected * 20
+
+
+def test_shared_reader(data_paths, recwarn):
+    reader = read(data_paths[0])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda _: reader.find_instances(SpaceFrame)[0], range(100)))
+
+    assert all(frame is frames[0] for frame in frames)
+
+
+def test_concurrent_first_reads(data_paths):
+    # Models must not be imported yet when the threads start, so the reads run in a fresh process
+    script = f'''
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import rama
+from rama.models.cube import NDPoint
+barrier = threading.Barrier(8)
+
+def find(_):
+    barrier.wait()
+    return len(rama.read({data_paths[3]!r}).find_instances(NDPoint))
+
+with ThreadPoolExecutor(max_workers=8) as pool:
+    assert len(set(pool.map(find, range(8)))) == 1
+'''
+    subprocess.run([sys.executable, '-c', script], check=True)
@@ -19,8 +19,7 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-from astropy.visualization import quantity_support
-quantity_support()
+from functools import lru_cache
 
 from rama.adapters.cube import TimeAxis
 
@@ -46,7 +45,18 @@ class TimeSeries:
         return self._index[item]
 
 
+@lru_cache(maxsize=None)
+def enable_quantity_support():
+    """
+    Let matplotlib plot astropy quantities. This is done on the first call to :py:func:`~plot` rather than on import,
+    so that matplotlib is not imported unless something is actually plotted.
+    """
+    from astropy.visualization import quantity_support
+    return quantity_support()
+
+
 def plot(ax, cube_object, **kwargs):
+    enable_quantity_support()
     time_series = TimeSeries(cube_object)
 
     kwargs['fmt'] = '.'
@@ -19,11 +19,12 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import threading
 
 
 class Singleton:
     """
-    A non-thread-safe helper class to ease implementing singletons.
+    A thread-safe helper class to ease implementing singletons.
     This should be used as a decorator -- not a metaclass -- to the
     class that should be a singleton.
 
@@ -40,6 +41,7 @@ class Singleton:
     def __init__(self, decorated):
         self._decorated = decorated
         self._instance = None
+        self._lock = threading.Lock()
         self.__doc__ = decorated.__doc__
         self.__name__ = decorated.__name__
         self.__bases__ = decorated.__bases__
@@ -53,7 +55,9 @@ class Singleton:
         On all subsequent calls, the already created instance is returned.
         """
         if self._instance is None:
-            self._instance = self._decorated()
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._decorated()
 
         return self._instance
 
@@ -0,0 +1,110 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Fast parsing of ISO 8601 dates and times.
+
+:py:func:`~parse_datetime` parses a single timestamp, e.g. the value of an ``ivoa:datetime`` LITERAL, with
+``datetime.fromisoformat``, and only falls back to the much slower, but much more lenient, ``dateutil`` parser for
+strings that are not strict ISO 8601.
+
+:py:func:`~to_datetime64` and :py:func:`~to_time` convert whole columns of timestamps at once, into numpy
+``datetime64`` arrays and astropy ``Time`` objects respectively. Both use the vectorized parsers of numpy and astropy,
+and only parse values one at a time when some of them are not in the formats those parsers support, e.g. if they have
+a time zone offset.
+"""
+import warnings
+from datetime import datetime, timezone
+
+import numpy
+from astropy.time import Time
+from dateutil import parser
+
+NOT_A_TIME = numpy.datetime64('NaT')
+
+# datetime.fromisoformat is not available before Python 3.7, where all timestamps are parsed by dateutil
+_fromisoformat = getattr(datetime, 'fromisoformat', None)
+
+
+def parse_datetime(value):
+    """
+    Parse the ISO 8601 timestamp ``value`` into a ``datetime``. Strings that are not ISO 8601 are parsed by
+    ``dateutil``, which raises a ``ValueError`` if it cannot parse them either.
+    """
+    if _fromisoformat is not None:
+        try:
+            return _fromisoformat(value)
+        except ValueError:
+            pass
+        # Before Python 3.11 fromisoformat does not support the Z designator
+        if value[-1:] in ('Z', 'z'):
+            try:
+                return _fromisoformat(value[:-1]).replace(tzinfo=timezone.utc)
+            except ValueError:
+                pass
+    return parser.parse(value)
+
+
+def to_datetime64(values, unit='us'):
+    """
+    Convert an array or a sequence of ISO 8601 timestamps to a ``datetime64`` array with the given ``unit``. Timestamps
+    with a time zone are converted to UTC. Empty strings and masked values are converted to ``NaT``.
+    """
+    dtype = numpy.dtype(f'datetime64[{unit}]')
+    if numpy.ma.isMaskedArray(values):
+        datetimes = to_datetime64(values.filled(''), unit)
+        datetimes[numpy.ma.getmaskarray(values)] = NOT_A_TIME
+        return datetimes
+
+    strings = numpy.asarray(values)
+    if strings.dtype.kind == 'M':
+        return strings.astype(dtype)
+    try:
+        with warnings.catch_warnings():
+            # numpy parses time zone offsets, but deprecates it: parse such values one at a time instead
+            warnings.simplefilter('error', DeprecationWarning)
+            return strings.astype(dtype)
+    except (ValueError, DeprecationWarning):
+        return numpy.array([_parse_datetime64(value, dtype) for value in strings.flat], dtype=dtype).reshape(
+            strings.shape)
+
+
+def to_time(values, scale='utc'):
+    """
+    Convert an array or a sequence of ISO 8601 timestamps to an astropy ``Time`` with the given ``scale``. Empty strings
+    and masked values are masked in the result.
+    """
+    try:
+        return Time(values, format='isot', scale=scale)
+    except ValueError:
+        time = Time(to_datetime64(values), format='datetime64', scale=scale)
+        time.format = 'isot'
+        return time
+
+
+def _parse_datetime64(value, dtype):
+    value = str(value).strip()
+    if not value or value == 'NaT':
+        return NOT_A_TIME
+    timestamp = parse_datetime(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return numpy.datetime64(timestamp).astype(dtype)
@@ -34,6 +34,11 @@ The module also defines a :py:class:`~VO` class decorator that can be used to ma
 Python classes to the VO-DML type they represent. When classes with the decorator are imported
 they are registered by the ID passed to the decorator.
 
+Model packages are registered as ``vo.dm.models`` entry points named after the prefix of their VO-DML types, e.g.
+``coords = rama.models.coordinates``. A model package is imported the first time a type with its prefix is looked up,
+so that only the models a document actually uses are ever imported. If no entry point is named after the prefix of a
+type, all the registered model packages are imported, once, before the type is reported as unknown.
+
 Example::
 
     >>> from rama.utils.registry import VO, TypeRegistry
@@ -55,34 +60,151 @@ Note that trying to instantiate the registry results in an exception:
 
 """
 
+import importlib
 import inspect
+import logging
+import threading
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # Python < 3.8
+    from importlib_metadata import entry_points
 
+from rama.framework import get_fields
 from rama.utils import Singleton
 
+LOG = logging.getLogger(__name__)
+
+MODELS_GROUP = 'vo.dm.models'
+
 
 @Singleton
 class TypeRegistry:
     """
-    A registry for VO-DML types
+    A registry for VO-DML types. Lookups never block: types are registered under a lock by replacing the type map with
+    an updated copy, so readers in other threads always see a complete map.
     """
     instance = None
 
     def __init__(self):
+        self._lock = threading.Lock()
+        self._import_lock = threading.RLock()
         self._type_map = {}
+        self._field_plans = {}
+        self._subclasses = {}
+        self._model_packages = None
+        self._imported_prefixes = set()
+        self._all_models_imported = False
 
     # TODO docstrings
     def get_by_id(self, vodml_id):
         element_class = self._type_map.get(vodml_id, None)
+        if element_class is None:
+            prefix = vodml_id.split(':', 1)[0]
+            # Look the type up again even if this thread did not import anything: another thread may have imported
+            # the model package while this one was waiting for it.
+            self.import_model(prefix)
+            element_class = self._type_map.get(vodml_id, None)
+            if element_class is None and self._import_models_for_unmatched(prefix):
+                element_class = self._type_map.get(vodml_id, None)
         if element_class is None:
             raise ValueError(f"Cannot find element with type id: {vodml_id}")
         return element_class
 
+    def import_model(self, prefix):
+        """
+        Import the model package registered for ``prefix``, unless it was imported already. Return ``True`` if the
+        package was imported by this call.
+        """
+        # Other threads looking up a type with the same prefix wait here until its package is fully imported
+        with self._import_lock:
+            if prefix in self._imported_prefixes:
+                return False
+            self._imported_prefixes.add(prefix)
+
+            module_name = self.model_packages.get(prefix, None)
+            if module_name is None:
+                return False
+            try:
+                importlib.import_module(module_name)
+                LOG.info(f"Successfully imported vodml model package {prefix}")
+            except ImportError:
+                LOG.warning(f"Cannot import vodml model package {prefix}")
+                return False
+            return True
+
+    def import_models(self):
+        """
+        Import all the registered model packages.
+        """
+        for prefix in self.model_packages:
+            self.import_model(prefix)
+        self._all_models_imported = True
+
+    def _import_models_for_unmatched(self, prefix):
+        # Model packages whose entry point is not named after their prefix can only be found by importing them all
+        if self._all_models_imported or prefix in self.model_packages:
+            return False
+        LOG.warning(f"No {MODELS_GROUP} entry point is named after the vodml prefix {prefix}, "
+                    f"importing all the model packages")
+        self.import_models()
+        return True
+
+    @property
+    def model_packages(self):
+        """
+        A dictionary mapping VO-DML prefixes to the name of the model package registered for them.
+        """
+        if self._model_packages is None:
+            self._model_packages = {entry_point.name: entry_point.value for entry_point in _get_entry_points()}
+        return self._model_packages
+
     def add(self, cls):
         if hasattr(cls, 'vodml_id') and inspect.isclass(cls):
-            self._type_map[cls.vodml_id] = cls
+            with self._lock:
+                self._type_map = {**self._type_map, cls.vodml_id: cls}
+                self._field_plans = {}
+                self._subclasses = {}
 
     def clean(self):
-        self._type_map = {}
+        with self._lock:
+            self._type_map = {}
+            self._field_plans = {}
+            self._subclasses = {}
+
+    def get_field_plan(self, cls):
+        """
+        Return the VO-DML fields of ``cls`` as computed by :py:func:`~rama.framework.get_fields`. Field plans are
+        computed once per class and discarded whenever the registry changes.
+        """
+        field_plans = self._field_plans
+        plan = field_plans.get(cls, None)
+        if plan is None:
+            # Threads racing here compute the same plan, so the last write wins harmlessly
+            plan = field_plans[cls] = get_fields(cls)
+        return plan
+
+    def get_subclasses(self, cls):
+        """
+        Return ``cls`` and all the registered classes that derive from it. All the registered model packages are
+        imported first, see :py:meth:`~import_models`, so that subclasses defined in models that were not used yet are
+        found too. As field plans, the result is cached until the registry changes.
+        """
+        subclasses = self._subclasses.get(cls, None)
+        if subclasses is None:
+            self.import_models()
+            all_subclasses = self._subclasses
+            derived = [registered for registered in self._type_map.values()
+                       if registered is not cls and issubclass(registered, cls)]
+            subclasses = all_subclasses[cls] = (cls, *derived)
+        return subclasses
+
+
+def _get_entry_points():
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, 'select'):
+        return all_entry_points.select(group=MODELS_GROUP)
+    return all_entry_points.get(MODELS_GROUP, [])  # Python < 3.10
 
 
 class VO:
@@ -0,0 +1,81 @@
+# Copyright 2018 Smithsonian Astrophysical Observatory
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+# disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+from datetime import datetime, timezone
+from unittest import mock
+
+import numpy
+import pytest
+from astropy.time import Time
+from numpy.testing import assert_array_equal
+
+from rama.utils.isotime import parse_datetime, to_datetime64, to_time
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2010-04-05', datetime(2010, 4, 5)),
+    ('2010-04-05T10:20:30.5', datetime(2010, 4, 5, 10, 20, 30, 500000)),
+    ('2010-04-05T10:20:30Z', datetime(2010, 4, 5, 10, 20, 30, tzinfo=timezone.utc)),
+    ('April 5, 2010 10:20', datetime(2010, 4, 5, 10, 20)),
+])
+def test_parse_datetime(value, expected):
+    assert parse_datetime(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2010-04-05T10:20:30.5', datetime(2010, 4, 5, 10, 20, 30, 500000)),
+    ('2010-04-05T10:20:30Z', datetime(2010, 4, 5, 10, 20, 30, tzinfo=timezone.utc)),
+])
+def test_parse_datetime_without_fromisoformat(value, expected):
+    with mock.patch('rama.utils.isotime._fromisoformat', None):
+        assert parse_datetime(value) == expected
+
+
+def test_parse_datetime_invalid():
+    with pytest.raises(ValueError):
+        parse_datetime('not a date')
+
+
+def test_to_datetime64():
+    datetimes = to_datetime64(['2010-04-05T10:20:30.5', '2010-04-05T10:20:30+02:00', ''])
+    expected = numpy.array(['2010-04-05T10:20:30.5', '2010-04-05T08:20:30', 'NaT'], dtype='datetime64[us]')
+    assert_array_equal(datetimes, expected)
+
+
+def test_to_datetime64_masked():
+    values = numpy.ma.array(['2010-04-05', 'garbage'], mask=[False, True])
+    datetimes = to_datetime64(values, unit='s')
+    assert datetimes.dtype == numpy.dtype('datetime64[s]')
+    assert datetimes[0] == numpy.datetime64('2010-04-05T00:00:00')
+    assert numpy.isnat(datetimes[1])
+
+
+def test_to_time():
+    times = to_time(numpy.array(['2010-04-05T10:20:30.5', '2011-01-01T00:00:00']), scale='tt')
+    assert times.scale == 'tt'
+    assert_array_equal(times.isot, ['2010-04-05T10:20:30.500', '2011-01-01T00:00:00.000'])
+
+
+def test_to_time_fallback():
+    times = to_time(['2010-04-05T10:20:30+02:00', ''])
+    assert times.format == 'isot'
+    assert times[0] == Time('2010-04-05T08:20:30', scale='utc')
+    assert times.mask.tolist() == [False, True]
@@ -19,8 +19,14 @@
 # SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
+from rama.framework import Attribute, Reference
 from rama.utils.registry import TypeRegistry, VO
 
 
@@ -44,6 +50,52 @@ def test_type_registry(registry):
     assert Foo == registry.get_by_id("foo:bar")
 
 
+def test_models_imported_on_demand():
+    script = '''
+import sys
+import rama
+from rama.utils.registry import TypeRegistry
+assert not [name for name in sys.modules if name.startswith('rama.models.')]
+assert 'pkg_resources' not in sys.modules
+frame = TypeRegistry.instance.get_by_id('coords:domain.space.SpaceFrame')
+assert frame.__module__ == 'rama.models.coordinates'
+assert 'rama.models.cube' not in sys.modules
+'''
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+
+def test_unknown_prefix(registry):
+    with pytest.raises(ValueError) as exc:
+        registry.get_by_id("nosuchmodel:Foo")
+
+    assert "nosuchmodel:Foo" in str(exc.value)
+    assert not registry.import_model("nosuchmodel")
+
+
+def test_entry_point_not_named_after_prefix(tmpdir):
+    package = tmpdir.mkdir('mypackage')
+    package.join('__init__.py').write('''
+from rama.utils.registry import VO
+
+@VO('mm:Thing')
+class Thing:
+    pass
+''')
+    distribution = tmpdir.mkdir('mypackage-0.1.dist-info')
+    distribution.join('METADATA').write('Metadata-Version: 2.1\nName: mypackage\nVersion: 0.1\n')
+    distribution.join('entry_points.txt').write('[vo.dm.models]\nmymodel = mypackage\n')
+
+    script = '''
+import sys
+from rama.utils.registry import TypeRegistry
+assert TypeRegistry.instance.get_by_id('mm:Thing').__module__ == 'mypackage'
+'''
+    result = subprocess.run([sys.executable, '-c', script], check=True, stderr=subprocess.PIPE,
+                            universal_newlines=True, env={**os.environ, 'PYTHONPATH': str(tmpdir)})
+
+    assert "named after the vodml prefix mm," in result.stderr
+
+
 def test_type_registry_singleton(registry):
     with pytest.raises(TypeError) as exc:
         TypeRegistry()
@@ -51,3 +103,75 @@ def test_type_registry_singleton(registry):
     assert 'Singletons must be accessed through `instance`.' in str(exc)
 
     assert TypeRegistry.instance is registry
+
+
+def test_field_plan(registry):
+    @VO("foo:bar")
+    class Foo:
+        b = Attribute("foo:bar.b")
+        a = Reference("foo:bar.a")
+
+    plan = registry.get_field_plan(Foo)
+
+    assert [name for name, _ in plan] == ['a', 'b']
+    assert plan[1][1] is Foo.__dict__['b']
+    assert registry.get_field_plan(Foo) is plan
+
+    @VO("foo:baz")
+    class Baz:
+        pass
+
+    assert registry.get_field_plan(Foo) is not plan
+    assert registry.get_field_plan(Foo) == plan
+
+
+def test_subclasses(registry):
+    @VO("foo:base")
+    class Base:
+        pass
+
+    @VO("foo:derived")
+    class Derived(Base):
+        pass
+
+    @VO("foo:other")
+    class Other:
+        pass
+
+    assert registry.get_subclasses(Base) == (Base, Derived)
+    assert registry.get_subclasses(Derived) == (Derived,)
+
+    @VO("foo:derived2")
+    class Derived2(Derived):
+        pass
+
+    assert registry.get_subclasses(Base) == (Base, Derived, Derived2)
+
+
+def test_subclasses_in_models_not_imported_yet():
+    script = '''
+import sys
+from rama.models.ivoa import StringQuantity
+from rama.utils.registry import TypeRegistry
+assert 'rama.models.coordinates' not in sys.modules
+names = [cls.__name__ for cls in TypeRegistry.instance.get_subclasses(StringQuantity)]
+assert 'StdRefFrame' in names
+'''
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+
+def test_concurrent_registration(registry):
+    @VO("foo:base")
+    class Base:
+        a = Attribute("foo:base.a")
+
+    def register(index):
+        cls = VO(f"foo:bar{index}")(type(f"Bar{index}", (), {}))
+        assert registry.get_by_id("foo:base") is Base
+        assert registry.get_field_plan(Base)[0][0] == 'a'
+        return cls
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        classes = list(pool.map(register, range(200)))
+
+    assert all(registry.get_by_id(f"foo:bar{index}") is cls for index, cls in enumerate(classes))
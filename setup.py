@@ -25,9 +25,11 @@ setup(
     name="rama",
     version="0.1",
     packages=find_packages(),
-    install_requires=['lxml', 'astropy', 'numpy', 'python-dateutil', 'matplotlib'],
+    install_requires=['lxml', 'astropy', 'numpy', 'python-dateutil', 'matplotlib',
+                      'importlib_metadata; python_version < "3.8"'],
     tests_require=['pytest'],
     include_package_data=True,
+    # Model entry points are named after the VO-DML prefix of their types, so that models are imported on demand
     entry_points={
         'vo.dm.models': [
             'ivoa = rama.models.ivoa',